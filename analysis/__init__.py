@@ -1,2 +1,6 @@
 from braytoncycle import BraytonCycle
-from sensitivity import Sensitivity
\ No newline at end of file
+from entropycache import EntropyCache
+from sensitivity import Sensitivity
+from uncertainty import Uncertainty
+from sobol import Sobol
+from envelope import FlightEnvelope
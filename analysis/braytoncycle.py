@@ -7,8 +7,8 @@ from components import AmbientInterface, Nozzle
 from directories import DIRS
 import numpy as np
 import matplotlib.pyplot as plt
-import requests
-from utils import ProgressBar, Attribute
+from utils import Attribute
+from utils.air import DryAir
 import os
 
 __author__ = 'San Kilkis'
@@ -55,63 +55,16 @@ class BraytonCycle(object):
 
     @Attribute
     def specific_entropy(self):
-        """ Allows look-up of reference Specific Entropy `s` of the ambient flow depending on the ambient static
-        temperature :pr:attr:`engine_in.ambient.t_static` and ambient static pressure
-        `py:attr:`engine_in.ambient.p_static`. If a cached value is already present in the look-up table then the online
-        calculator won't be accessed. Otherwise, this process takes some time as a request to the server has to be made.
+        """ Reference Specific Entropy `s` of the ambient flow depending on the ambient static temperature
+        :py:attr:`engine_in.ambient.t_static` and ambient static pressure :py:attr:`engine_in.ambient.p_static`, which
+        is evaluated locally w/ the dry air model of :py:class:`DryAir`. Tabulated reference values are available
+        separately through :py:class:`EntropyCache`.
 
         :return: Specific Entropy in SI Joule per kilogram Kelvin [J/kg K]
-        :rtype: float
+        :rtype: float or np.ndarray
         """
-        prog = ProgressBar('Fetching Entropy Value')
-        temp = self.engine_in.ambient.t_static - 273.15
-        pres = self.engine_in.ambient.p_static / 1000.
-        tol = {'temperature': 10., 'pressure': 1.}  # Tolerances for cache search procedure
-
-        # Opening cache as read-only file to look-up stored values
-        with open(DIRS['ENTROPY_TABLE_DIR']) as cache:
-            entries = cache.readlines()[1:]
-            valid_entries = []
-            for entry in entries:
-                try:
-                    cached_temp, cached_pres, cached_s0 = entry.split('\t')
-                    cached_temp, cached_pres, cached_s0 = float(cached_temp), float(cached_pres), float(cached_s0)
-                    temp_error, pres_error = temp - cached_temp, pres - cached_pres
-                    if temp_error < tol['temperature'] or pres_error < tol['pressure']:
-                        # [0] Temperature [1] Pressure [2] Entropy [3] Squared Error
-                        valid_entries += [(cached_temp, cached_pres, cached_s0, (temp_error + pres_error)**2)]
-                except Exception as e:
-                    raise e
-
-        if len(valid_entries) == 0:  # No valid entries found online database must be accessed
-            with requests.Session() as session:
-                prog.update(25, 'Loading Session')
-                calculator_url = 'http://www.irc.wisc.edu/properties/'
-                data = {'units': 'International',
-                        'fluid': 'Dry Air',
-                        'parameter1': 'T',  # State 1 = Temperature
-                        'parameter2': 'P',  # State 2 = Pressure
-                        'state1': '{}'.format(temp),  # Degrees Celcius
-                        'state2': '{}'.format(pres),  # Absolute Pressure in kPa
-                        'calculate': 'Calculate Properties'}
-                prog.update(35, 'Posting Request to Database')
-                response = session.post(calculator_url, data=data)
-                prog.update(90, 'Parsing Response')
-                result_hdr = ('<!-- Calculation Results -->', '</table')  # Tuple of start [0] end [1] strings
-
-                raw = response.text.split(result_hdr[0])[-1].split(result_hdr[1])[0]
-                filtered = raw.replace('\t', '').replace('\n', '').split('Entropy: ')[-1].split(' J')[0]
-                s0 = float(filtered)  # Entropy in J/kg K
-
-                # Writing value to cache and returning
-                with open(DIRS['ENTROPY_TABLE_DIR'], 'a') as cache:
-                    cache.write('\n{:.10f}\t{:.10f}\t{:.10f}'.format(temp, pres, s0))
-                prog.update(100, 'Complete')
-                return s0
-        else:
-            closest_match = sorted(valid_entries, key=lambda x: x[-1])[0]  # Returns entry with minimum sq. Error
-            prog.update(100, 'Complete')
-            return closest_match[2]
+        return DryAir(t_static=self.engine_in.ambient.t_static,
+                      p_static=self.engine_in.ambient.p_static).specific_entropy
 
     # def isobaric_lines(self, plot_limits=(6000, 8000, 0, 800), n_lines=30):
     #     """ Plots isobaric lines utilizing the specific heat of the fuel/air mixture (gas) to better match the
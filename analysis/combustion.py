@@ -6,6 +6,7 @@
 from definitions import Attribute, Stage, FlowCondition
 from directories import DIRS
 from engine.specparser import SpecReader
+from utils import SyncWriter
 from matplotlib import pyplot as plt
 import os
 
@@ -14,16 +15,18 @@ class ChamberSpecs(SpecReader):
 
     __default_directory__ = DIRS['DATA_DIR']
 
+    __required__ = ('v_cc', 'pr_cc', 'amf_pz', 'amf_sz', 'amf_dz', 'fmf_pz', 'fmf_sz', 'fmf_dz')
+
     @Attribute
     def can_volume(self):
         """ Volume of the chamber where the main combustion process occurs in SI meter cubed [m^3] """
-        return float(self.reader['v_cc'])
+        return self.reader['v_cc']
 
     @Attribute
     def pressure_loss(self):
         """ Total estimated hot and cold pressure loss in the combustion chamber expressed as the ratio between the
         outflow and inflow pressure """
-        return float(self.reader['pr_cc'])
+        return self.reader['pr_cc']
 
     @Attribute
     def air_mass_fractions(self):
@@ -32,7 +35,7 @@ class ChamberSpecs(SpecReader):
 
         :rtype: dict
         """
-        return {key.split('_')[-1]: float(self.reader[key]) for key in ('amf_pz', 'amf_sz', 'amf_dz')}
+        return {key.split('_')[-1]: self.reader[key] for key in ('amf_pz', 'amf_sz', 'amf_dz')}
 
     @Attribute
     def fuel_mass_fractions(self):
@@ -41,7 +44,7 @@ class ChamberSpecs(SpecReader):
 
         :rtype: dict
         """
-        return {key.split('_')[-1]: float(self.reader[key]) for key in ('fmf_pz', 'fmf_sz', 'fmf_dz')}
+        return {key.split('_')[-1]: self.reader[key] for key in ('fmf_pz', 'fmf_sz', 'fmf_dz')}
 
 
 class OperatingCondition(Stage):
@@ -145,15 +148,20 @@ class CombustionAnalysis(object):
                 # TODO add a more comprehensive input file reading/checking mechanism
                 raise e
 
-    def write_csv(self):
-        """ Writes an output .csv file containing data from the analysis of the current combustion chamber """
-        with open(os.path.join(DIRS['CSV_DIR'], '{}_combustion.csv'.format(self.engine_name)), 'w') as csv:
-            csv.write('condition, fuel_flow, phi_bar, heat_density, phi_pz, phi_sz, phi_dz\n')
-            e = self.equivalence_ratios
-            for i, c in enumerate(self.operating_conditions):
-                data_tuple = (c.name, c.fuel_flow, c.equivalence_ratio, self.heat_density[i] / 1e6, e[i]['pz'],
-                              e[i]['sz'], e[i]['dz'])
-                csv.write('{}\n'.format(','.join(map(str, data_tuple))))
+    def write_csv(self, writer=None):
+        """ Writes an output .csv file containing data from the analysis of the current combustion chamber
+
+        :param AsyncWriter writer: (Optional) Writer that serializes the file, i.e. an :py:class:`AsyncWriter` to
+                                   write in the background, defaults to a synchronous :py:class:`SyncWriter`
+        """
+        lines = ['condition, fuel_flow, phi_bar, heat_density, phi_pz, phi_sz, phi_dz\n']
+        e = self.equivalence_ratios
+        for i, c in enumerate(self.operating_conditions):
+            data_tuple = (c.name, c.fuel_flow, c.equivalence_ratio, self.heat_density[i] / 1e6, e[i]['pz'],
+                          e[i]['sz'], e[i]['dz'])
+            lines.append('{}\n'.format(','.join(map(str, data_tuple))))
+        (writer or SyncWriter()).write(os.path.join(DIRS['CSV_DIR'], '{}_combustion.csv'.format(
+            self.engine_name)), ''.join(lines))
 
     def plot_overall(self):
         """ Plots the parameters which result in overall quantities on the combustion process (fuel flow, ov.
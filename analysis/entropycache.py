@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" Contains the binary cache of tabulated reference entropy values of dry air """
+
+from __future__ import division
+from utils import AttrDict
+from directories import *
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Locking is only available on POSIX systems
+    fcntl = None
+
+__author__ = 'San Kilkis'
+
+
+class EntropyCache(object):
+
+    # Number of float64 values of a record: static temperature [K], static pressure [Pa] and specific entropy [J/kg K]
+    __fields__ = 3
+
+    # Offsets of the neighbouring cells of the grid index, including the cell itself
+    __neighbours__ = [(i, j) for i in (-1, 0, 1) for j in (-1, 0, 1)]
+
+    def __init__(self, filename=None, legacy_filename=None):
+        """ Append-only cache of tabulated specific entropy values of dry air w/ a spatial index over the static
+        temperature and pressure.
+
+        Records are stored as consecutive float64 triplets (T, p, s) in SI units in a binary file that is memory-mapped
+        read-only, hence no parsing takes place. Appends from multiple processes are serialized by an exclusive lock
+        on the file and always write whole records, readers only map the complete records that are present and re-map
+        the file once it has grown. If the binary file does not exist yet it is created from the legacy text table
+        `legacy_filename` w/ temperatures in degrees Celsius and pressures in kilo-Pascal.
+
+        Queries use a sorted grid w/ cells the size of the tolerance, thus only the 3 x 3 neighbouring cells of each
+        queried state have to be searched and a batch of M queries against N records costs O(M log N).
+
+        :param str filename: (Optional) Path of the binary cache, defaults to `entropy_table.bin` in the cache directory
+        :param str legacy_filename: (Optional) Path of the text table, defaults to `DIRS['ENTROPY_TABLE_DIR']`
+        """
+        self.filename = os.path.abspath(filename if filename is not None else
+                                        os.path.join(DIRS['CACHE_DIR'], 'entropy_table.bin'))
+        self.legacy_filename = legacy_filename if legacy_filename is not None else DIRS['ENTROPY_TABLE_DIR']
+        self._records, self._indices = None, {}
+        if not os.path.isfile(self.filename):
+            self.convert()
+
+    def __repr__(self):
+        return "<'{}' {} w/ {} record(s) at {}>".format(os.path.basename(self.filename), self.__class__.__name__,
+                                                        len(self), hex(id(self)))
+
+    def __len__(self):
+        return self.records.shape[0]
+
+    def convert(self):
+        """ Creates the binary cache from the records of the legacy text table, if the binary cache is still empty
+        once the lock is acquired, i.e. no other process converted it in the meantime """
+        with open(self.filename, 'ab') as cache:
+            self.lock(cache)
+            try:
+                if os.fstat(cache.fileno()).st_size == 0 and os.path.isfile(self.legacy_filename):
+                    legacy = np.loadtxt(self.legacy_filename, skiprows=1, ndmin=2)
+                    records = np.column_stack([legacy[:, 0] + 273.15, legacy[:, 1] * 1000., legacy[:, 2]])
+                    cache.write(records.astype(np.float64).tobytes())
+                    cache.flush()
+            finally:
+                self.unlock(cache)
+
+    @staticmethod
+    def lock(cache):
+        if fcntl is not None:
+            fcntl.flock(cache.fileno(), fcntl.LOCK_EX)
+
+    @staticmethod
+    def unlock(cache):
+        if fcntl is not None:
+            fcntl.flock(cache.fileno(), fcntl.LOCK_UN)
+
+    @property
+    def records(self):
+        """ Memory-mapped records w/ shape (N, 3), re-mapped if another process appended to the file
+
+        :rtype: np.ndarray
+        """
+        size = os.path.getsize(self.filename) // (8 * self.__fields__)  # Only complete records are mapped
+        if self._records is None or self._records.shape[0] != size:
+            self._records = (np.memmap(self.filename, dtype=np.float64, mode='r', shape=(size, self.__fields__))
+                             if size > 0 else np.empty((0, self.__fields__)))
+            self._indices = {}
+        return self._records
+
+    def append(self, t_static, p_static, specific_entropy):
+        """ Appends (arrays of) entries to the cache
+
+        :param t_static: Static Temperature in SI Kelvin [K]
+        :param p_static: Static Pressure in SI Pascal [Pa]
+        :param specific_entropy: Specific Entropy in SI Joule per kilogram Kelvin [J/kg K]
+        """
+        records = np.column_stack([np.ravel(entry) for entry in np.broadcast_arrays(
+            *[np.asarray(value, dtype=np.float64) for value in (t_static, p_static, specific_entropy)])])
+        if not np.all(np.isfinite(records)):
+            raise ValueError('Only finite entries can be appended to the entropy cache')
+
+        with open(self.filename, 'ab') as cache:
+            self.lock(cache)
+            try:
+                cache.write(records.tobytes())
+                cache.flush()
+            finally:
+                self.unlock(cache)
+
+    @staticmethod
+    def cells(t_static, p_static, tolerance):
+        """ Integer coordinates of the grid cells that contain the states """
+        return (np.floor(np.asarray(t_static) / tolerance[0]).astype(np.int64),
+                np.floor(np.asarray(p_static) / tolerance[1]).astype(np.int64))
+
+    def index(self, tolerance):
+        """ Sorted grid index of the records for cells of size `tolerance`, which is built once per tolerance
+
+        :return: Sorted cell keys, the corresponding record indices and the bounds of the pressure cells
+        :rtype: tuple
+        """
+        records = self.records
+        try:
+            return self._indices[tolerance]
+        except KeyError:
+            row, column = self.cells(records[:, 0], records[:, 1], tolerance)
+            bounds = (column.min(), column.max()) if column.size else (0, 0)
+            keys = row * (bounds[1] - bounds[0] + 3) + (column - bounds[0] + 1)
+            order = np.argsort(keys, kind='mergesort')
+            return self._indices.setdefault(tolerance, (keys[order], order, bounds))
+
+    def query(self, t_static, p_static, tolerance=(10., 1000.)):
+        """ Finds the closest cached record of each queried state w/ a temperature AND pressure deviation within
+        `tolerance`, the distance is measured relative to the tolerance of each axis
+
+        :param t_static: Static Temperature in SI Kelvin [K], can be an (N-D) array
+        :param p_static: Static Pressure in SI Pascal [Pa], broadcast against `t_static`
+        :param tuple tolerance: Tolerance on the temperature in SI Kelvin [K] and pressure in SI Pascal [Pa]
+        :return: Mask of the states w/ a match 'found' and the 't_static', 'p_static' and 'specific_entropy' of the
+                 matched records, which are NaN where no match was found
+        :rtype: AttrDict
+        """
+        tolerance = tuple(float(value) for value in tolerance)
+        t_static, p_static = np.broadcast_arrays(np.asarray(t_static, dtype=float), np.asarray(p_static, dtype=float))
+        shape, t_static, p_static = t_static.shape, t_static.ravel(), p_static.ravel()
+        records = self.records
+        keys, order, bounds = self.index(tolerance)
+        row, column = self.cells(t_static, p_static, tolerance)
+
+        best, distance = np.full(t_static.shape, -1, dtype=np.int64), np.full(t_static.shape, np.inf)
+        for i, j in self.__neighbours__:
+            valid = (column + j >= bounds[0]) & (column + j <= bounds[1])  # Cells outside the bounds are empty
+            key = (row + i) * (bounds[1] - bounds[0] + 3) + (column + j - bounds[0] + 1)
+            start, stop = np.searchsorted(keys, key, side='left'), np.searchsorted(keys, key, side='right')
+            stop = np.where(valid, stop, start)
+            for offset in range(int(np.max(stop - start, initial=0))):
+                active = np.flatnonzero(start + offset < stop)
+                candidate = order[start[active] + offset]
+                dt = (records[candidate, 0] - t_static[active]) / tolerance[0]
+                dp = (records[candidate, 1] - p_static[active]) / tolerance[1]
+                d = dt ** 2 + dp ** 2
+                closer = (np.abs(dt) <= 1.) & (np.abs(dp) <= 1.) & (d < distance[active])
+                best[active[closer]], distance[active[closer]] = candidate[closer], d[closer]
+
+        found = best >= 0
+        matched = np.full((t_static.size, self.__fields__), np.nan)
+        matched[found] = records[best[found]]
+        return AttrDict({'found': found.reshape(shape),
+                         't_static': matched[:, 0].reshape(shape),
+                         'p_static': matched[:, 1].reshape(shape),
+                         'specific_entropy': matched[:, 2].reshape(shape)})
+
+
+if __name__ == '__main__':
+    obj = EntropyCache()
+    print(obj)
+    print(obj.query(t_static=np.array([216., 230., 288.15]), p_static=np.array([22632., 30000., 101325.])))
@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" Contains the flight-envelope sweep of an engine over Mach number, altitude and ISA deviation """
+
+from __future__ import division
+import matplotlib.pyplot as plt
+from definitions import FlowCondition
+from utils import Attribute, AttrDict, SyncWriter, design_grid, write_columns
+from utils.isa import ISA
+from directories import *
+import numpy as np
+import os
+
+__author__ = 'San Kilkis'
+
+
+class FlightEnvelope(object):
+
+    def __init__(self, engine_in=None, mach=None, altitude=None, delta_t=None, off_design=False,
+                 combustion_temperature=None, processes=1):
+        """ Evaluates an engine over a full-factorial grid of flight Mach numbers, altitudes and (optionally) ISA
+        temperature deviations. The ambient conditions of all grid points are obtained from a single vectorized
+        :py:class:`ISA` call and stored in one ambient :py:class:`FlowCondition`, after which the whole grid is pushed
+        through the compiled :py:class:`CycleKernel` of `engine_in` as one batch.
+
+        By default the cycle of `engine_in` (pressure ratios, bypass ratio, corrected mass flow and combustion
+        temperature) is evaluated at each ambient condition, which is equivalent to creating an :py:class:`Engine` w/
+        a modified `[ambient_conditions]` block for every point. If `off_design` is toggled the engine is instead sized
+        at its design point and matched at each ambient condition w/ :py:class:`OffDesign`.
+
+        :param Engine engine_in: Engine to evaluate
+        :param collections.Sequence[float] mach: Flight Mach numbers
+        :param collections.Sequence[float] altitude: Geo-potential altitudes in SI meter [m]
+        :param collections.Sequence[float] delta_t: (Optional) ISA temperature deviations in SI Kelvin [K], if
+                                                    provided these span the last axis of the grid
+        :param bool off_design: Toggles between the design cycle and the off-design operating point at each point
+        :param float combustion_temperature: (Optional) Throttle setting for the off-design mode in SI Kelvin [K],
+                                             defaults to the design value
+        :param int processes: Number of worker processes that share the grid, `None` uses all cores
+        """
+        self.engine_in = engine_in
+        self.mach = np.atleast_1d(np.asarray(mach if mach is not None else engine_in.ambient.mach, dtype=float))
+        self.altitude = np.atleast_1d(np.asarray(altitude if altitude is not None else 0., dtype=float))
+        self.delta_t = None if delta_t is None else np.atleast_1d(np.asarray(delta_t, dtype=float))
+        self.off_design = off_design
+        self.combustion_temperature = combustion_temperature
+        self.processes = processes
+
+    @Attribute
+    def grid(self):
+        """ Full-factorial grid of the flight conditions w/ shape (mach, altitude[, delta_t])
+
+        :rtype: AttrDict
+        """
+        ranges = [self.mach, self.altitude] + ([] if self.delta_t is None else [self.delta_t])
+        grid = design_grid(ranges, full_factorial=True)
+        return AttrDict({'mach': grid[0],
+                         'altitude': grid[1],
+                         'delta_t': grid[2] if self.delta_t is not None else np.zeros(grid[0].shape)})
+
+    @Attribute
+    def atmosphere(self):
+        """ Vectorized ISA at all grid points
+
+        :rtype: ISA
+        """
+        return ISA(altitude=self.grid.altitude, delta_t=self.grid.delta_t)
+
+    @Attribute
+    def ambient(self):
+        """ Ambient flow condition of all grid points, the corrected mass flow is that of `engine_in`
+
+        :rtype: FlowCondition
+        """
+        return FlowCondition(mach=self.grid.mach,
+                             p_static=self.atmosphere.pressure,
+                             t_static=self.atmosphere.temperature,
+                             corrected_mass_flow=self.engine_in.corrected_mass_flow,
+                             medium='air',
+                             station_number='0')
+
+    @Attribute
+    def results(self):
+        """ Thrust in SI Newton [N], TSFC in SI gram per kilo-Newton second [g/kN s], fuel flow and the station data
+        of :py:meth:`CycleKernel.evaluate` over the grid, as well as the 'converged' mask in the off-design mode
+
+        :rtype: AttrDict
+        """
+        state = {key: getattr(self.ambient, key) for key in ('mach', 'p_static', 't_static')}
+        if self.off_design:
+            from engine import OffDesign  # Imported here as the engine package depends on the analysis package
+            if self.combustion_temperature is not None:
+                state['combustion_temperature'] = self.combustion_temperature
+            return OffDesign(self.engine_in).solve(**state)
+
+        # Evaluating w/ map broadcasts all quantities to the full grid, also when the grid is not split over processes
+        return self.engine_in.compile().map(processes=self.processes,
+                                            corrected_mass_flow=self.ambient.corrected_mass_flow,
+                                            **state)
+
+    @property
+    def thrust(self):
+        return self.results.thrust
+
+    @property
+    def sfc(self):
+        return self.results.sfc
+
+    def plot(self, quantity='thrust', deviation_index=0):
+        """ Contour plot of `quantity` over the Mach number and altitude
+
+        :param str quantity: Either 'thrust' or 'sfc'
+        :param int deviation_index: Index of the ISA deviation to plot if `delta_t` spans the last axis of the grid
+        """
+        plt.style.use('tudelft')
+        values = getattr(self, quantity)
+        grid = self.grid
+        mach, altitude = grid.mach, grid.altitude
+        if self.delta_t is not None:
+            values, mach, altitude = [entry[..., deviation_index] for entry in (values, mach, altitude)]
+
+        fig = plt.figure('{} Flight Envelope'.format(self.engine_in.__name__))
+        contour = plt.contourf(mach, altitude / 1000., values, 20)
+        plt.colorbar(contour, label=r'Thrust $\left[\mathrm{N}\right]$' if quantity == 'thrust' else
+                     r'Specific Fuel Consumption $\left[\frac{\mathrm{g}}{\mathrm{kN} \cdot \mathrm{s}}\right]$')
+        plt.xlabel(r'Flight Mach Number $\left[-\right]$')
+        plt.ylabel(r'Altitude $\left[\mathrm{km}\right]$')
+        plt.title('{} Flight Envelope'.format(self.engine_in.__name__))
+        plt.show()
+        fig.savefig(os.path.join(DIRS['FIGURE_DIR'], '{}_envelope_{}'.format(self.engine_in.__name__, quantity)))
+
+    def write_csv(self, writer=None):
+        """ Writes the flight condition, thrust and sfc of every grid point to the CSV directory
+
+        :param AsyncWriter writer: (Optional) Writer that serializes the file, i.e. an :py:class:`AsyncWriter` to
+                                   write in the background, defaults to a synchronous :py:class:`SyncWriter`
+        """
+        names = ('mach', 'altitude', 'delta_t', 'thrust', 'sfc')
+        data = np.column_stack([np.ravel(self.grid[key] if key in self.grid else self.results[key]) for key in names])
+        (writer or SyncWriter()).submit(write_columns, os.path.join(
+            DIRS['CSV_DIR'], '{}_envelope.csv'.format(self.engine_in.__name__)), names, data)
+
+
+if __name__ == '__main__':
+    from engine import Engine
+    obj = FlightEnvelope(Engine(filename='GENX.cfg'), mach=np.linspace(0., 0.85, 18),
+                         altitude=np.linspace(0., 12000., 25))
+    print(obj.thrust.shape)
+    obj.plot('thrust')
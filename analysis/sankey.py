@@ -5,7 +5,7 @@
 
 from components import Turbine
 from collections import namedtuple
-from utils import Attribute
+from utils import Attribute, SyncWriter
 from directories import DIRS
 import os
 
@@ -270,23 +270,23 @@ class SankeyDiagram(object):
                 'heat_jet': (self.gas_power - self.prop_power) / self.chemical_power,
                 'kinetic_energy': (self.prop_power - self.thrust_power) / self.chemical_power}
 
-    def write_csv(self):
-        """ Writes an output .csv file containing relevant parameters to create the Sankey Diagram """
-        # Second pass writes ordered .csv file
+    def write_csv(self, writer=None):
+        """ Writes an output .csv file containing relevant parameters to create the Sankey Diagram
+
+        :param AsyncWriter writer: (Optional) Writer that serializes the file, i.e. an :py:class:`AsyncWriter` to
+                                   write in the background, defaults to a synchronous :py:class:`SyncWriter`
+        """
         engine_name = self.engine_in.__name__
         filename = '{}_sankey_{}.csv'.format(engine_name, 'ideal' if self.engine_in.ideal_cycle else 'real')
-        with open(os.path.join(DIRS['CSV_DIR'], filename), "w") as csv:
-            csv.write('<<< Powers >>>\n')
-            for key, value in self.sankey_powers.items():
-                csv.write('{}\t{}\n'.format(key, value))
-
-            csv.write('\n<<< Efficiencies >>>\n')
-            for key, value in self.sankey_etas.items():
-                csv.write('{}\t{}\n'.format(key, value))
-
-            csv.write('\n<<< Losses >>>\n')
-            for key, value in self.sankey_losses.items():
-                csv.write('{}\t{}\n'.format(key, value))
+        lines = ['<<< Powers >>>\n']
+        lines += ['{}\t{}\n'.format(key, value) for key, value in self.sankey_powers.items()]
+
+        lines += ['\n<<< Efficiencies >>>\n']
+        lines += ['{}\t{}\n'.format(key, value) for key, value in self.sankey_etas.items()]
+
+        lines += ['\n<<< Losses >>>\n']
+        lines += ['{}\t{}\n'.format(key, value) for key, value in self.sankey_losses.items()]
+        (writer or SyncWriter()).write(os.path.join(DIRS['CSV_DIR'], filename), ''.join(lines))
 
     def plot(self):
         return NotImplementedError('Plotting of the Sankey Diagram is not yet implemented, this is planned for a'
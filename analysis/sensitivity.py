@@ -4,9 +4,9 @@
 """ Contains all abstract class definitions  """
 
 import matplotlib.pyplot as plt
-from scipy.optimize import curve_fit
-from utils import Attribute
+from utils import Attribute, SyncWriter, Dual
 from directories import *
+import numpy as np
 import os
 
 __author__ = 'San Kilkis'
@@ -18,14 +18,22 @@ __author__ = 'San Kilkis'
 
 class Sensitivity(object):
 
-    def __init__(self, engine_in=None):
+    # Design parameters that are investigated by :py:meth:`plot_param`
+    param_list = ['combustion_temperature', 'bypass_ratio', 'pr_cc', 'pr_fan', 'pr_lpc', 'pr_hpc']
+
+    def __init__(self, engine_in=None, processes=1, chunk_size=None):
         """
 
         :param Engine engine_in:
+        :param int processes: Number of worker processes that share the perturbation batch, `None` uses all cores
+        :param int chunk_size: (Optional) Number of perturbed design points per task of a worker
         """
         self.engine_in = engine_in
+        self.processes = processes
+        self.chunk_size = chunk_size
         self.design_variable, self.design_range = None, None  # TODO Remove when functionality to plot 1 var is required
-        self.filename, self.ideal_cycle, _, _, self.ambient = self.engine_in.args
+        self.spec = self.engine_in.spec
+        self.filename, self.ideal_cycle, self.ambient = self.spec.filename, self.spec.ideal_cycle, self.spec.ambient
         self.slope_cache_param = {'thrust': {}, 'sfc': {}}
         self.slope_cache_eta = {'thrust': {}, 'sfc': {}}
 
@@ -46,28 +54,81 @@ class Sensitivity(object):
         """
         return a * x
 
+    @staticmethod
+    def fit_slope(x, y):
+        """ Closed-form least-squares fit of the slope `a` of :py:meth:`func` to the data points (x, y)
+
+        :param np.ndarray x: Values on the x-axis
+        :param np.ndarray y: Values on the y-axis
+        :rtype: float
+        """
+        return np.sum(x * y) / np.sum(x * x)
+
     @Attribute
-    def param_sim(self):
+    def batch_sim(self):
+        """ Evaluates the perturbations of all design parameters in :py:attr:`param_list` and all efficiencies in
+        :py:attr:`design_variable` as one block-structured batch in a single call of the compiled
+        :py:class:`CycleKernel` of :py:attr:`engine_in`. Each block varies one variable over the range given by
+        :py:meth:`Engine.get_range` while all other inputs remain at the design point. The batch is split over
+        :py:attr:`processes` worker processes in chunks of :py:attr:`chunk_size` points.
+
+        :return: Dictionary of variable names w/ the percentage change of the variable, thrust and sfc response
+        :rtype: dict[str, tuple]
+        """
+        kernel = self.engine_in.compile()
+        variables = self.param_list + list(self.design_variable)
+        blocks = [self.engine_in.get_range(var)[0] for var in variables]
+        bounds = np.cumsum([0] + [len(block) for block in blocks])
 
-        param_list = ['combustion_temperature', 'bypass_ratio', 'pr_cc', 'pr_fan', 'pr_lpc', 'pr_hpc']
-        output = []
+        # Stacking the blocks, every variable is held at its design value outside of its own block
+        inputs = {}
+        for var, block, start, end in zip(variables, blocks, bounds[:-1], bounds[1:]):
+            inputs[var] = np.full(bounds[-1], kernel.defaults[var], dtype=float)
+            inputs[var][start:end] = block
+        out = kernel.map(processes=self.processes, chunk_size=self.chunk_size, **inputs)
 
-        for i, var in enumerate(param_list):
-            engine_class = self.engine_in.__class__
-            engine_sim = engine_class(self.filename, self.ideal_cycle, var, self.design_range, self.ambient)
+        return {var: (((block / kernel.defaults[var]) - 1.) * 100, out.thrust[start:end], out.sfc[start:end])
+                for var, block, start, end in zip(variables, blocks, bounds[:-1], bounds[1:])}
 
-            percentage = ((engine_sim.design_range / engine_sim.design_range[engine_sim.original_index]) - 1.) * 100
-            thrust_response = engine_sim.thrust
-            sfc_response = engine_sim.sfc
+    @Attribute
+    def slope_table(self):
+        """ Fits the slopes of the thrust and sfc response w.r.t. the percentage change of all design parameters and
+        efficiencies, the results are also stored in :py:attr:`slope_cache_param` and :py:attr:`slope_cache_eta`
 
-            # Appending to the output_list
-            output += [(percentage, thrust_response, sfc_response)]
+        :return: Dictionary w/ the fitted 'thrust' and 'sfc' slope for each variable
+        :rtype: dict[str, dict]
+        """
+        for var, (percentage, thrust_response, sfc_response) in self.batch_sim.items():
+            cache = self.slope_cache_param if var in self.param_list else self.slope_cache_eta
+            cache['thrust'][var] = self.fit_slope(percentage, thrust_response)
+            cache['sfc'][var] = self.fit_slope(percentage, sfc_response)
+        return {'thrust': dict(self.slope_cache_param['thrust'], **self.slope_cache_eta['thrust']),
+                'sfc': dict(self.slope_cache_param['sfc'], **self.slope_cache_eta['sfc'])}
+
+    @Attribute
+    def derivatives(self):
+        """ Exact local slopes of the thrust and sfc w.r.t. the percentage change of all design parameters and
+        efficiencies at the design point. These are obtained in a single pass of the compiled :py:class:`CycleKernel`
+        w/ :py:class:`Dual` numbers, thus they are the tangents at the design point rather than the fitted slopes over
+        the range of :py:attr:`slope_table`
+
+        :return: Dictionary w/ the 'thrust' and 'sfc' slope per percent change of each variable
+        :rtype: dict[str, dict]
+        """
+        kernel = self.engine_in.compile()
+        variables = self.param_list + list(self.design_variable)
+        out = kernel(**Dual.seed(**{var: kernel.defaults[var] for var in variables}))
+        return {key: {var: getattr(out, key).derivative(var) * kernel.defaults[var] / 100. for var in variables}
+                for key in ('thrust', 'sfc')}
 
-            # Calculating Slopes and adding to the :py:attr`slope_cache`
-            self.slope_cache_param['thrust'][var] = curve_fit(self.func, percentage, thrust_response)[0][0]
-            self.slope_cache_param['sfc'][var] = curve_fit(self.func, percentage, sfc_response)[0][0]
+    @Attribute
+    def param_sim(self):
+        """ Response of the thrust and sfc to the design parameters in :py:attr:`param_list`
 
-        return output
+        :rtype: list[tuple]
+        """
+        _ = self.slope_table  # Ensures that the slopes are present in :py:attr:`slope_cache_param`
+        return [self.batch_sim[var] for var in self.param_list]
 
     def plot_param(self):
         plt.style.use('tudelft')
@@ -115,30 +176,28 @@ class Sensitivity(object):
         plt.show()
         fig.savefig(os.path.join(DIRS['FIGURE_DIR'], '{}_param_sens'.format(self.engine_in.__name__)))
 
-    def write_csv(self):
-        with open(os.path.join(DIRS['CSV_DIR'], '{}_param_slope.csv'.format(self.engine_in.__name__)), "w") as csv:
-
-            for key, sfc_slope, thrust_slope in zip(obj.slope_cache_param['sfc'].keys(),
-                                                    obj.slope_cache_param['sfc'].values(),
-                                                    obj.slope_cache_param['thrust'].values()):
-
-                csv.write('{}, {}, {}\n'.format(key, sfc_slope, thrust_slope))
+    def write_csv(self, writer=None):
+        """ Writes the slopes of the sfc and thrust w.r.t. the design parameters and the efficiencies
 
-        with open(os.path.join(DIRS['CSV_DIR'], '{}_eta_slope.csv'.format(self.engine_in.__name__)), "w") as csv:
-
-            for key, sfc_slope, thrust_slope in zip(obj.slope_cache_eta['sfc'].keys(),
-                                                    obj.slope_cache_eta['sfc'].values(),
-                                                    obj.slope_cache_eta['thrust'].values()):
-
-                csv.write('{}, {}, {}\n'.format(key, sfc_slope, thrust_slope))
+        :param AsyncWriter writer: (Optional) Writer that serializes the file, i.e. an :py:class:`AsyncWriter` to
+                                   write in the background, defaults to a synchronous :py:class:`SyncWriter`
+        """
+        _ = self.slope_table  # Ensures that the slopes of all variables are computed
+        writer = writer or SyncWriter()
+        for name, cache in (('param', self.slope_cache_param), ('eta', self.slope_cache_eta)):
+            lines = ['{}, {}, {}\n'.format(key, sfc_slope, thrust_slope)
+                     for key, sfc_slope, thrust_slope in zip(cache['sfc'].keys(),
+                                                             cache['sfc'].values(),
+                                                             cache['thrust'].values())]
+            writer.write(os.path.join(DIRS['CSV_DIR'], '{}_{}_slope.csv'.format(self.engine_in.__name__, name)),
+                         ''.join(lines))
 
     def plot_eta(self):
         plt.style.use('tudelft')
         fig, (thrust, sfc) = plt.subplots(2, 1, num='{} Efficiency Sensitivity'.format(self.engine_in.__name__),
                                           sharex='all')
 
-        # Obtaining :py:class:`Engine` without circular import
-        engine_class = self.engine_in.__class__
+        _ = self.slope_table  # Ensures that the slopes are present in :py:attr:`slope_cache_eta`
 
         # Initializing Labels
         thrust.set_ylabel(r'Thrust $\left[\mathrm{N}\right]$')
@@ -149,19 +208,13 @@ class Sensitivity(object):
         for i, var in enumerate(self.design_variable):
             cycle_count = i % len(linestyles)
             style = linestyles[cycle_count]
-            eta_0 = getattr(engine_class(self.filename, self.ideal_cycle, self.ambient), var)
-            engine_sim = engine_class(self.filename, self.ideal_cycle, var, self.design_range, self.ambient)
-
-            percentage_scale = ((engine_sim.design_range / eta_0) - 1.) * 100
-
-            self.slope_cache_eta['thrust'][var] = curve_fit(self.func, percentage_scale, engine_sim.thrust)[0][0]
-            self.slope_cache_eta['sfc'][var] = curve_fit(self.func, percentage_scale, engine_sim.sfc)[0][0]
+            percentage_scale, thrust_response, sfc_response = self.batch_sim[var]
 
-            thrust.plot(percentage_scale, engine_sim.thrust,
+            thrust.plot(percentage_scale, thrust_response,
                         label=r'$\eta_{\mathrm{%s}}$' % var.split('_')[-1],
                         linestyle=style,
                         linewidth=1.0)
-            sfc.plot(percentage_scale, engine_sim.sfc,
+            sfc.plot(percentage_scale, sfc_response,
                      label=r'$\eta_{\mathrm{%s}}$' % var.split('_')[-1],
                      linestyle=style,
                      linewidth=1.0)
@@ -0,0 +1,208 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" Contains the variance-based global sensitivity analysis of the cycle w/ Sobol indices """
+
+from __future__ import division
+from utils import Attribute, AttrDict, SyncWriter
+from directories import *
+import numpy as np
+import os
+
+__author__ = 'San Kilkis'
+
+
+class Sobol(object):
+
+    # Outputs of the :py:class:`CycleKernel` that are analysed
+    outputs = ('thrust', 'sfc')
+
+    def __init__(self, engine_in=None, variables=None, bounds=None, spread=0.05, samples=2 ** 13, resamples=200,
+                 confidence=0.95, seed=None, processes=1):
+        """ Computes the first-order and total Sobol indices of the thrust and sfc w.r.t. the inputs of the cycle.
+        Contrary to :py:class:`Sensitivity` the inputs are varied simultaneously over their full range, thus the
+        indices also capture non-linear effects and interactions, e.g. between `combustion_temperature` and `eta_hpt`.
+
+        The Saltelli sampling scheme is used: two independent sample matrices A and B as well as the matrices AB_i,
+        which are equal to A except for column i that is taken from B, are stacked into a single batch of
+        ``samples * (len(variables) + 2)`` design points and evaluated w/ one call of the compiled
+        :py:class:`CycleKernel`. Confidence intervals are obtained by bootstrapping the stored outputs, hence the
+        engine is not re-evaluated. Rows of the sample matrices that result in an infeasible cycle, i.e. a non-finite
+        output for A, B or any of the AB_i, are excluded from the estimates of that output.
+
+        :param Engine engine_in: Engine at its design point
+        :param collections.Sequence[str] variables: (Optional) Inputs of the :py:class:`CycleKernel` that are varied,
+                                                    defaults to all of them
+        :param dict bounds: (Optional) Lower and upper bound of the uniform distribution of each variable
+        :param float spread: Relative half-width of the uniform distribution around the design value of variables that
+                             are not present in `bounds`, efficiencies and the combustor pressure ratio are capped at
+                             unity
+        :param int samples: Number of rows of the base sample matrices
+        :param int resamples: Number of bootstrap resamples used for the confidence intervals
+        :param float confidence: Confidence level of the intervals
+        :param int seed: (Optional) Seed of the random number generator to obtain reproducible results
+        :param int processes: Number of worker processes that share the batch, `None` uses all cores
+        """
+        self.engine_in = engine_in
+        self.variables = None if variables is None else tuple(variables)
+        self.bounds = dict(bounds) if bounds is not None else {}
+        self.spread = spread
+        self.samples = int(samples)
+        self.resamples = int(resamples)
+        self.confidence = confidence
+        self.seed = seed
+        self.processes = processes
+
+    @Attribute
+    def kernel(self):
+        return self.engine_in.compile()
+
+    @Attribute
+    def names(self):
+        """ Names of the varied inputs
+
+        :rtype: tuple[str]
+        """
+        names = self.kernel.__inputs__ if self.variables is None else self.variables
+        unknown = [name for name in names if name not in self.kernel.__inputs__]
+        if unknown:
+            raise KeyError('The following variables are not inputs of the cycle: {}'.format(', '.join(unknown)))
+        return tuple(names)
+
+    @Attribute
+    def limits(self):
+        """ Lower and upper bound of each variable
+
+        :rtype: np.ndarray
+        """
+        limits = []
+        for name in self.names:
+            if name in self.bounds:
+                lower, upper = self.bounds[name]
+            else:
+                value = self.kernel.defaults[name]
+                lower, upper = value * (1. - self.spread), value * (1. + self.spread)
+                if name.startswith('eta_') or name == 'pr_cc':
+                    upper = min(upper, 1.)
+            limits.append((lower, upper))
+        return np.array(limits, dtype=float)
+
+    @Attribute
+    def sample_matrices(self):
+        """ Base sample matrices A and B of shape (samples, variables) drawn uniformly within :py:attr:`limits`
+
+        :rtype: tuple[np.ndarray]
+        """
+        random_state = np.random.RandomState(self.seed)
+        lower, upper = self.limits[:, 0], self.limits[:, 1]
+        a, b = [lower + (upper - lower) * random_state.random_sample((self.samples, len(self.names)))
+                for _ in range(2)]
+        return a, b
+
+    @Attribute
+    def evaluations(self):
+        """ Outputs of the stacked Saltelli batch, each of shape (variables + 2, samples) where row 0 and 1 correspond
+        to A and B and row i + 2 to AB_i
+
+        :rtype: dict[str, np.ndarray]
+        """
+        a, b = self.sample_matrices
+        k = len(self.names)
+
+        # Stacking A, B and all AB_i as the leading axis, column i of AB_i is taken from B
+        stacked = np.empty((k + 2, ) + a.shape)
+        stacked[0], stacked[1] = a, b
+        stacked[2:] = a
+        stacked[2 + np.arange(k), :, np.arange(k)] = b.T
+
+        inputs = {name: stacked[:, :, i] for i, name in enumerate(self.names)}
+        out = self.kernel.map(processes=self.processes, **inputs)
+        return {key: np.asarray(out[key]) for key in self.outputs}
+
+    @staticmethod
+    def indices(f_a, f_b, f_ab):
+        """ Estimates the first-order (Saltelli, 2010) and total (Jansen, 1999) Sobol indices from the outputs. All
+        arguments can carry leading axes, i.e. for bootstrap resamples, the samples are along the last axis.
+
+        :param np.ndarray f_a: Outputs of matrix A
+        :param np.ndarray f_b: Outputs of matrix B
+        :param np.ndarray f_ab: Outputs of the matrices AB_i w/ the variables along the first axis
+        :return: First-order and total indices w/ the variables along the first axis
+        :rtype: tuple[np.ndarray]
+        """
+        # Centering the outputs does not change the estimates in expectation but greatly reduces their variance
+        samples = np.concatenate((f_a, f_b), axis=-1)
+        mean = np.mean(samples, axis=-1)[..., np.newaxis]
+        f_a, f_b, f_ab = f_a - mean, f_b - mean, f_ab - mean
+        variance = np.var(samples, axis=-1)
+        first = np.mean(f_b * (f_ab - f_a), axis=-1) / variance
+        total = 0.5 * np.mean((f_a - f_ab) ** 2, axis=-1) / variance
+        return first, total
+
+    def bootstrap(self, f_a, f_b, f_ab, max_size=int(1e7)):
+        """ Bootstrap resamples of the indices, drawn in blocks such that at most `max_size` values are resampled at
+        once
+
+        :return: First-order and total indices of shape (variables, resamples)
+        :rtype: tuple[np.ndarray]
+        """
+        random_state = np.random.RandomState(None if self.seed is None else self.seed + 1)
+        n, k = f_a.size, f_ab.shape[0]
+        block = max(1, max_size // (n * (k + 2)))
+        first, total = [], []
+        for start in range(0, self.resamples, block):
+            index = random_state.randint(0, n, size=(min(block, self.resamples - start), n))
+            s_first, s_total = self.indices(f_a[index], f_b[index], f_ab[:, index])
+            first.append(s_first)
+            total.append(s_total)
+        return np.concatenate(first, axis=-1), np.concatenate(total, axis=-1)
+
+    @Attribute
+    def results(self):
+        """ First-order and total Sobol indices of the thrust and sfc w/ their bootstrap confidence intervals
+
+        :return: Dictionary per output w/ 'first' and 'total' indices and 'first_conf' and 'total_conf' intervals,
+                 each as a dictionary w/ the variable names as keys, as well as the number of 'invalid' rows
+        :rtype: AttrDict
+        """
+        alpha = (1. - self.confidence) / 2.
+        results = {}
+        for key, values in self.evaluations.items():
+            feasible = np.all(np.isfinite(values), axis=0)
+            f_a, f_b, f_ab = values[0, feasible], values[1, feasible], values[2:, feasible]
+            first, total = self.indices(f_a, f_b, f_ab)
+            boot_first, boot_total = self.bootstrap(f_a, f_b, f_ab)
+            first_conf = np.percentile(boot_first, [100. * alpha, 100. * (1. - alpha)], axis=-1).T
+            total_conf = np.percentile(boot_total, [100. * alpha, 100. * (1. - alpha)], axis=-1).T
+            results[key] = {'first': dict(zip(self.names, first)),
+                            'total': dict(zip(self.names, total)),
+                            'first_conf': dict(zip(self.names, map(tuple, first_conf))),
+                            'total_conf': dict(zip(self.names, map(tuple, total_conf))),
+                            'invalid': np.count_nonzero(~feasible)}
+        return AttrDict(results)
+
+    def write_csv(self, writer=None):
+        """ Writes the indices and confidence intervals of all outputs to the CSV directory
+
+        :param AsyncWriter writer: (Optional) Writer that serializes the file, i.e. an :py:class:`AsyncWriter` to
+                                   write in the background, defaults to a synchronous :py:class:`SyncWriter`
+        """
+        lines = ['output, variable, first, first_low, first_high, total, total_low, total_high\n']
+        for key in self.outputs:
+            result = self.results[key]
+            for name in self.names:
+                lines.append('{}, {}, {}, {}, {}, {}, {}, {}\n'.format(key, name, result.first[name],
+                                                                       result.first_conf[name][0],
+                                                                       result.first_conf[name][1],
+                                                                       result.total[name],
+                                                                       result.total_conf[name][0],
+                                                                       result.total_conf[name][1]))
+        (writer or SyncWriter()).write(os.path.join(DIRS['CSV_DIR'], '{}_sobol.csv'.format(
+            self.engine_in.__name__)), ''.join(lines))
+
+
+if __name__ == '__main__':
+    from engine import Engine
+    obj = Sobol(Engine(filename='GENX.cfg'), seed=0)
+    for var in obj.names:
+        print('{:>24s} {:8.4f} {:8.4f}'.format(var, obj.results.thrust.first[var], obj.results.thrust.total[var]))
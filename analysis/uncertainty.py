@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" Contains the Monte Carlo propagation of uncertain engine inputs through the cycle """
+
+from __future__ import division
+from utils import Attribute, AttrDict, SyncWriter, ProgressBar, StreamingStatistics
+from directories import *
+import numpy as np
+import os
+
+__author__ = 'San Kilkis'
+
+
+class Uncertainty(object):
+
+    # Outputs of the :py:class:`CycleKernel` that are summarized
+    outputs = ('thrust', 'sfc')
+
+    def __init__(self, engine_in=None, distributions=None, samples=int(1e6), chunk_size=int(1e5), seed=None,
+                 quantiles=(0.05, 0.5, 0.95), bins=4096, show_progress=False):
+        """ Propagates scatter of the engine inputs, i.e. the component efficiencies and pressure ratios, through the
+        cycle by Monte Carlo sampling. Samples are drawn and evaluated w/ the compiled :py:class:`CycleKernel` of
+        `engine_in` in chunks of `chunk_size`, after which only the :py:class:`StreamingStatistics` of the outputs are
+        retained. The memory is therefore bounded by the chunk size rather than the number of samples.
+
+        Distributions are provided as a tuple of the name of a :py:class:`numpy.random.RandomState` method followed by
+        its parameters, or as a callable accepting the random state and the number of samples, i.e.:
+
+        >>> Uncertainty(Engine(filename='GENX.cfg'), {'eta_fan': ('normal', 0.9, 0.005),
+        ...                                           'pr_fan': ('uniform', 1.55, 1.65),
+        ...                                           'eta_hpt': lambda rng, n: rng.triangular(0.88, 0.9, 0.91, n)})
+
+        :param Engine engine_in: Engine at its design point, un-sampled inputs remain at their design values
+        :param dict distributions: Distribution of each uncertain input of the :py:class:`CycleKernel`
+        :param int samples: Total number of Monte Carlo samples
+        :param int chunk_size: Number of samples that are drawn and evaluated at once
+        :param int seed: (Optional) Seed of the random number generator to obtain reproducible results
+        :param collections.Sequence[float] quantiles: Probabilities of the reported quantiles
+        :param int bins: Number of histogram bins used to estimate the quantiles
+        :param bool show_progress: Toggles the display of a :py:class:`ProgressBar` over the chunks
+        """
+        self.engine_in = engine_in
+        self.distributions = dict(distributions) if distributions is not None else {}
+        self.samples = int(samples)
+        self.chunk_size = int(chunk_size)
+        self.seed = seed
+        self.quantiles = tuple(quantiles)
+        self.bins = bins
+        self.show_progress = show_progress
+
+        if self.samples < 1 or self.chunk_size < 1:
+            raise ValueError('The number of samples and the chunk size must be positive integers')
+
+    @staticmethod
+    def draw(random_state, distribution, size):
+        """ Draws `size` samples from a single `distribution`, see :py:class:`Uncertainty` for the accepted formats
+
+        :param np.random.RandomState random_state: Random number generator
+        :param distribution: Tuple of a :py:class:`numpy.random.RandomState` method name and its parameters or callable
+        :param int size: Number of samples
+        :rtype: np.ndarray
+        """
+        if callable(distribution):
+            return np.asarray(distribution(random_state, size), dtype=float)
+        name, parameters = distribution[0], distribution[1:]
+        try:
+            method = getattr(random_state, name)
+        except AttributeError:
+            raise ValueError("Unknown distribution '{}'".format(name))
+        return method(*parameters, size=size)
+
+    def chunks(self):
+        """ Generator of the input samples in chunks, variables are drawn in alphabetical order from a single random
+        state thus the samples only depend on the `seed` and the `chunk_size`
+
+        :rtype: collections.Iterator[dict]
+        """
+        random_state = np.random.RandomState(self.seed)
+        names = sorted(self.distributions.keys())
+        for start in range(0, self.samples, self.chunk_size):
+            size = min(self.chunk_size, self.samples - start)
+            yield {name: self.draw(random_state, self.distributions[name], size) for name in names}
+
+    @Attribute
+    def statistics(self):
+        """ Streaming statistics of the outputs after evaluating all samples
+
+        :rtype: dict[str, StreamingStatistics]
+        """
+        kernel = self.engine_in.compile()
+        unknown = [name for name in self.distributions if name not in kernel.__inputs__]
+        if unknown:
+            raise KeyError('The following inputs are not inputs of the cycle: {}'.format(', '.join(unknown)))
+
+        stats = {key: StreamingStatistics(bins=self.bins) for key in self.outputs}
+        total = -(-self.samples // self.chunk_size)
+        prog = ProgressBar('Propagating {} Monte Carlo Samples'.format(self.samples)) if self.show_progress else None
+        for i, inputs in enumerate(self.chunks()):
+            out = kernel(**inputs)
+            for key in self.outputs:
+                stats[key].update(out[key])
+            if prog is not None:
+                prog.update_loop(i + 1, total)
+        return stats
+
+    @Attribute
+    def results(self):
+        """ Mean, variance, standard deviation, extremes and quantiles of the thrust in SI Newton [N] and the TSFC in
+        SI gram per kilo-Newton second [g/kN s]
+
+        :rtype: AttrDict
+        """
+        return AttrDict({key: stats.summary(self.quantiles) for key, stats in self.statistics.items()})
+
+    def write_csv(self, writer=None):
+        """ Writes the summary of all outputs w/ one row per output to the CSV directory
+
+        :param AsyncWriter writer: (Optional) Writer that serializes the file, i.e. an :py:class:`AsyncWriter` to
+                                   write in the background, defaults to a synchronous :py:class:`SyncWriter`
+        """
+        header = ['output', 'count', 'invalid', 'mean', 'std', 'min', 'max'] + ['q{}'.format(q) for q in self.quantiles]
+        lines = [', '.join(header) + '\n']
+        for key in self.outputs:
+            summary = self.results[key]
+            row = [key] + [summary[entry] for entry in header[1:7]] + [summary.quantiles[q] for q in self.quantiles]
+            lines.append(', '.join(str(entry) for entry in row) + '\n')
+        (writer or SyncWriter()).write(os.path.join(DIRS['CSV_DIR'], '{}_uncertainty.csv'.format(
+            self.engine_in.__name__)), ''.join(lines))
+
+
+if __name__ == '__main__':
+    from engine import Engine
+    obj = Uncertainty(Engine(filename='GENX.cfg'),
+                      distributions={'eta_fan': ('normal', 0.92, 0.005),
+                                     'eta_lpc': ('normal', 0.92, 0.005),
+                                     'eta_hpc': ('normal', 0.92, 0.005),
+                                     'eta_hpt': ('normal', 0.91, 0.005),
+                                     'eta_lpt': ('normal', 0.91, 0.005),
+                                     'eta_nozzle': ('uniform', 0.98, 1.),
+                                     'pr_fan': ('normal', 1.6, 0.01)},
+                      seed=0, show_progress=True)
+    print(obj.results.thrust)
+    print(obj.results.sfc)
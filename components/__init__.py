@@ -6,3 +6,4 @@ from combustion import CombustionChamber
 from spool import Spool
 from turbine import Turbine
 from nozzle import Nozzle
+from maps import ComponentMap
@@ -3,7 +3,7 @@
 
 """ ADD DOC """
 
-from definitions import Stage, FlowCondition
+from definitions import Stage, FlowCondition, Attribute
 from inlet import Inlet
 from fan import Fan
 
@@ -14,29 +14,31 @@ __author__ = 'San Kilkis'
 
 class Bypass(Stage):
 
+    __stations__ = ('outflow_core', 'outflow_bypass')
+
     def __init__(self, inflow, bypass_ratio):
         self.inflow = inflow
         self.bypass_ratio = bypass_ratio
 
-    @property
+    @Attribute
     def t_total(self):
         """ Total temperature remains constant across the inlet """
         return self.inflow.t_total
 
-    @property
+    @Attribute
     def mass_flow_core(self):
         return self.inflow.mass_flow / (self.bypass_ratio + 1.)
 
-    @property
+    @Attribute
     def mass_flow_bypass(self):
         return self.mass_flow_core * self.bypass_ratio
 
-    @property
+    @Attribute
     def p_total(self):
         """ Total pressure remains constant only distributed """
         return self.inflow.p_total
 
-    @property
+    @Attribute
     def outflow_core(self):
         return FlowCondition(mass_flow=self.mass_flow_core,
                              t_total=self.t_total,
@@ -44,7 +46,7 @@ class Bypass(Stage):
                              station_number='21',
                              medium='air')
 
-    @property
+    @Attribute
     def outflow_bypass(self):
         return FlowCondition(mass_flow=self.mass_flow_bypass,
                              t_total=self.t_total,
@@ -3,7 +3,7 @@
 
 """ ADD DOC """
 
-from definitions import Stage, FlowCondition
+from definitions import Stage, FlowCondition, Attribute
 
 __author__ = 'San Kilkis'
 
@@ -24,18 +24,18 @@ class CombustionChamber(Stage):
         self.pressure_ratio = pressure_ratio
         self.t_total_exit = t_total_exit
 
-    @property
+    @Attribute
     def fuel_flow(self):
         """ Fuel flow in the Combustion Chamber in SI kilogram per second [kg s^-1] """
         return (self.inflow.mass_flow * self.specific_heat_gas * (self.t_total_exit - self.inflow.t_total)) /\
                (self.eta * self.lower_heating_value)
 
-    @property
+    @Attribute
     def p_total(self):
         """ Total pressure changes proportionally across the combustion chamber as a multiple of the pressure ratio """
         return self.inflow.p_total * self.pressure_ratio
 
-    @property
+    @Attribute
     def outflow(self):
         return FlowCondition(mass_flow=self.inflow.mass_flow + self.fuel_flow,
                              t_total=self.t_total_exit,
@@ -3,7 +3,7 @@
 
 """ ADD DOC """
 
-from definitions import Stage, FlowCondition
+from definitions import Stage, FlowCondition, Attribute
 import numpy as np
 
 __author__ = 'San Kilkis'
@@ -26,30 +26,30 @@ class Compressor(Stage):
         self.station_number = station_number
         self.isentropic = isentropic
 
-    @property
+    @Attribute
     def t_total(self):
         """ Total temperature is not constant across the fan """
         return self.inflow.t_total * (1 + (self.pressure_ratio**((self.inflow.kappa - 1) /
                                                                  self.inflow.kappa) - 1) / self.eta)
 
-    @property
+    @Attribute
     def t_isentropic(self):
         """ Total Temperature if the flow is was compressed Isentropically while maintaing pressure ratio of the stage
         in SI Kelvin [K] """
         return self.inflow.t_total * np.exp((self.gas_constant / self.inflow.specific_heat) *
                                             np.log(self.p_total / self.inflow.p_total))
 
-    @property
+    @Attribute
     def p_total(self):
         """ Total pressure changes proportionally across the fan as a multiple of the pressure ratio """
         return self.inflow.p_total * self.pressure_ratio
 
-    @property
+    @Attribute
     def work_done(self):
         """ Work done by the compressor on the flow in SI Watt [W] """
         return self.inflow.mass_flow * self.inflow.specific_heat * (self.t_total - self.inflow.t_total)
 
-    @property
+    @Attribute
     def outflow(self):
         return FlowCondition(mass_flow=self.inflow.mass_flow,
                              t_total=self.t_isentropic if self.isentropic else self.t_total,
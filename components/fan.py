@@ -3,7 +3,7 @@
 
 """ ADD DOC """
 
-from definitions import Stage, FlowCondition
+from definitions import Stage, FlowCondition, Attribute
 from inlet import Inlet
 from compressor import Compressor
 
@@ -24,7 +24,7 @@ class Fan(Compressor):
     #                          medium='air',
     #                          station_number='21')
 
-    @property
+    @Attribute
     def outflow(self):
         return FlowCondition(mass_flow=self.inflow.mass_flow,
                              t_total=self.t_isentropic if self.isentropic else self.t_total,
@@ -3,7 +3,7 @@
 
 """ ADD DOC """
 
-from definitions import Stage, FlowCondition
+from definitions import Stage, FlowCondition, Attribute
 from copy import deepcopy
 
 __author__ = 'San Kilkis'
@@ -13,20 +13,22 @@ __author__ = 'San Kilkis'
 
 class AmbientInterface(Stage):
 
+    __stations__ = ('inflow', 'outflow')
+
     def __init__(self, ambient):
         self.inflow = ambient
 
-    @property
+    @Attribute
     def t_total(self):
         """ Total temperature remains constant across the interface """
         return self.inflow.t_total
 
-    @property
+    @Attribute
     def p_total(self):
         """ Total pressure remains constant across the interface """
         return self.inflow.p_total
 
-    @property
+    @Attribute
     def outflow(self):
         outflow = deepcopy(self.inflow)
         outflow.station_number = '1'
@@ -39,17 +41,17 @@ class Inlet(Stage):
         self.inflow = inflow
         self.eta = eta
 
-    @property
+    @Attribute
     def t_total(self):
         """ Total temperature remains constant across the inlet """
         return self.inflow.t_total
 
-    @property
+    @Attribute
     def p_total(self):
         p, eta, k, m = self.inflow.p_static, self.eta, self.inflow.kappa, self.inflow.mach
         return p * (1 + (eta * ((k - 1) / 2.) * m ** 2)) ** (k / (k - 1))
 
-    @property
+    @Attribute
     def outflow(self):
         return FlowCondition(t_total=self.t_total, p_total=self.p_total, station_number='2',
                              mass_flow=self.inflow.mass_flow, medium='air')
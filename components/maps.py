@@ -0,0 +1,173 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" Contains the storage format and vectorized interpolation of component performance maps """
+
+from __future__ import division
+from utils import AttrDict
+import numpy as np
+import os
+
+__author__ = 'San Kilkis'
+
+
+class ComponentMap(object):
+
+    # Tables stored in a map file, in order of the leading axis
+    __tables__ = ('corrected_flow', 'pressure_ratio', 'efficiency')
+
+    __methods__ = ('bilinear', 'bicubic')
+
+    # Memory-mapped tables shared by all maps in the current process, keyed by the absolute path of the file
+    __loaded__ = {}
+
+    def __init__(self, filename, method='bilinear'):
+        """ Performance map of a :py:class:`Compressor`, :py:class:`Fan` or :py:class:`Turbine`, i.e. the corrected
+        flow, pressure ratio and efficiency as a function of the corrected speed and the beta line.
+
+        A map file is a single NumPy ``.npy`` array of shape (3, speeds + 1, betas + 1) w/ one table per entry of
+        :py:attr:`__tables__`. The first row and column of each table hold the beta and speed axis respectively, see
+        :py:meth:`write`. Files are memory-mapped read-only and shared by all maps of the process, thus only the pages
+        that are queried are read from disk and forked worker processes share them through the OS page cache.
+
+        :param str filename: Path to the map file
+        :param str method: Interpolation method, either 'bilinear' or 'bicubic' (Catmull-Rom)
+        """
+        if method not in self.__methods__:
+            raise ValueError("Invalid interpolation method '{}', valid entries are: {}".format(
+                method, ', '.join(self.__methods__)))
+        self.filename = os.path.abspath(filename)
+        self.method = method
+
+    def __repr__(self):
+        return "<'{}' {} object at {}>".format(os.path.basename(self.filename), self.__class__.__name__, hex(id(self)))
+
+    @classmethod
+    def write(cls, filename, speed, beta, corrected_flow, pressure_ratio, efficiency):
+        """ Stores a map in the file format of :py:class:`ComponentMap`
+
+        :param str filename: Path of the map file, the ``.npy`` extension is added if not present
+        :param np.ndarray speed: Strictly increasing corrected speed axis w/ shape (n, )
+        :param np.ndarray beta: Strictly increasing beta line axis w/ shape (m, )
+        :param np.ndarray corrected_flow: Corrected mass flow w/ shape (n, m)
+        :param np.ndarray pressure_ratio: Pressure ratio w/ shape (n, m)
+        :param np.ndarray efficiency: Isentropic efficiency w/ shape (n, m)
+        :return: Path of the written file
+        :rtype: str
+        """
+        speed, beta = np.asarray(speed, dtype=float), np.asarray(beta, dtype=float)
+        if np.any(np.diff(speed) <= 0) or np.any(np.diff(beta) <= 0):
+            raise ValueError('The speed and beta axis of a map must be strictly increasing')
+
+        data = np.zeros((len(cls.__tables__), speed.size + 1, beta.size + 1))
+        data[:, 0, 1:], data[:, 1:, 0] = beta, speed
+        for i, table in enumerate((corrected_flow, pressure_ratio, efficiency)):
+            data[i, 1:, 1:] = table
+        filename = filename if filename.endswith('.npy') else filename + '.npy'
+        np.save(filename, data)
+        cls.__loaded__.pop(os.path.abspath(filename), None)
+        return filename
+
+    @property
+    def data(self):
+        """ Memory-mapped array of the map file
+
+        :rtype: np.memmap
+        """
+        try:
+            return self.__loaded__[self.filename]
+        except KeyError:
+            if not os.path.isfile(self.filename):
+                raise IOError('Component map {} does not exist'.format(self.filename))
+            data = np.load(self.filename, mmap_mode='r')
+            if data.ndim != 3 or data.shape[0] != len(self.__tables__) or min(data.shape[1:]) < 3:
+                raise ValueError('Component map {} is not a valid map file'.format(self.filename))
+            return self.__loaded__.setdefault(self.filename, data)
+
+    @property
+    def speed(self):
+        return np.asarray(self.data[0, 1:, 0])
+
+    @property
+    def beta(self):
+        return np.asarray(self.data[0, 0, 1:])
+
+    def table(self, name):
+        """ Memory-mapped table of the quantity `name`
+
+        :rtype: np.memmap
+        """
+        return self.data[self.__tables__.index(name), 1:, 1:]
+
+    @staticmethod
+    def cells(axis, values):
+        """ Index of the cell of `axis` that contains each of the `values` and the normalized position within it,
+        values outside of the axis are clamped to its bounds
+
+        :rtype: tuple[np.ndarray]
+        """
+        index = np.clip(np.searchsorted(axis, values, side='right') - 1, 0, axis.size - 2)
+        position = (values - axis[index]) / (axis[index + 1] - axis[index])
+        return index, np.clip(position, 0., 1.)
+
+    def locate(self, speed, beta):
+        """ Precomputes the stencil of the queried (arrays of) `speed` and `beta`, i.e. the flat indices of the
+        neighbouring nodes within a table of the map file and their interpolation weights along both axes. The stencil
+        is the same for all tables of the map, thus it is re-used for every lookup w/ :py:meth:`interpolate`
+
+        :return: Shape of the queries, flat node indices w/ shape (queries, k, k) and the weights along the speed and
+                 beta axis w/ shape (queries, k) where k is 2 for bilinear and 4 for bicubic interpolation
+        :rtype: tuple
+        """
+        speed, beta = np.broadcast_arrays(np.asarray(speed, dtype=float), np.asarray(beta, dtype=float))
+        (i, t), (j, u) = self.cells(self.speed, speed.ravel()), self.cells(self.beta, beta.ravel())
+        n, m = self.speed.size, self.beta.size
+        if self.method == 'bilinear':
+            offsets = np.arange(2)
+            weights_speed, weights_beta = [np.stack([1 - x, x], axis=-1) for x in (t, u)]
+        else:  # Catmull-Rom stencil of 4 x 4 nodes, clamped at the edges of the table
+            offsets = np.arange(-1, 3)
+            weights_speed, weights_beta = self.weights(t), self.weights(u)
+        rows = np.clip(i[:, np.newaxis] + offsets, 0, n - 1)
+        columns = np.clip(j[:, np.newaxis] + offsets, 0, m - 1)
+        index = (rows[:, :, np.newaxis] + 1) * (m + 1) + (columns[:, np.newaxis, :] + 1)  # Skipping the axes
+        return speed.shape, index, weights_speed, weights_beta
+
+    def interpolate(self, name, stencil):
+        """ Interpolates the table `name` w/ the precomputed `stencil` of :py:meth:`locate`
+
+        :rtype: np.ndarray
+        """
+        shape, index, weights_speed, weights_beta = stencil
+        offset = self.__tables__.index(name) * self.data[0].size
+        nodes = np.take(self.data.reshape(-1), index + offset)  # Only the pages of the queried nodes are read
+        return np.einsum('na,nab,nb->n', weights_speed, nodes, weights_beta).reshape(shape)
+
+    @staticmethod
+    def weights(t):
+        """ Catmull-Rom spline weights of the 4 neighbouring nodes at the normalized position `t` within a cell """
+        t2, t3 = t ** 2, t ** 3
+        return 0.5 * np.stack([-t3 + 2 * t2 - t,
+                               3 * t3 - 5 * t2 + 2,
+                               -3 * t3 + 4 * t2 + t,
+                               t3 - t2], axis=-1)
+
+    def __call__(self, speed, beta):
+        """ Looks up all tables at the (arrays of) corrected `speed` and `beta` line
+
+        :return: Corrected flow, pressure ratio and efficiency broadcast to the shape of the queries
+        :rtype: AttrDict
+        """
+        stencil = self.locate(speed, beta)
+        return AttrDict({name: self.interpolate(name, stencil) for name in self.__tables__})
+
+
+if __name__ == '__main__':
+    import tempfile
+    n, b = np.meshgrid(np.linspace(0.5, 1.1, 7), np.linspace(0., 1., 11), indexing='ij')
+    path = ComponentMap.write(os.path.join(tempfile.gettempdir(), 'sample_map'), n[:, 0], b[0],
+                              corrected_flow=n * (0.8 + 0.2 * b),
+                              pressure_ratio=1. + 0.6 * n ** 2 * (1.2 - 0.4 * b),
+                              efficiency=0.92 - 0.2 * (n - 0.95) ** 2 - 0.05 * (b - 0.5) ** 2)
+    obj = ComponentMap(path, method='bicubic')
+    print(obj(speed=np.linspace(0.6, 1., 5), beta=0.5))
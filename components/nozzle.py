@@ -3,8 +3,8 @@
 
 """ ADD DOC """
 
-from definitions import Stage, FlowCondition
-from collections import Iterable
+from definitions import Stage, FlowCondition, Attribute
+from utils.dual import where
 import numpy as np
 
 __author__ = 'San Kilkis'
@@ -14,8 +14,13 @@ __author__ = 'San Kilkis'
 
 class Nozzle(Stage):
 
+    # Treatment of unchoked (design) points, see :py:meth:`select`
+    __choke_policies__ = ('subsonic', 'nan', 'masked', 'raise')
+
+    __stations__ = ('nozzle_flow', 'outflow')
+
     # TODO finish documentation
-    def __init__(self, inflow, ambient, eta, nozzle_type, station_number):
+    def __init__(self, inflow, ambient, eta, nozzle_type, station_number, choke_policy='subsonic'):
         """ TEST LALALAL
 
         :param FlowCondition inflow: Flow conditions entering the nozzle
@@ -23,6 +28,8 @@ class Nozzle(Stage):
         :param eta: Nozzle efficiency
         :param str nozzle_type: Specifies the geometry of the nozzle
         :param collections.Sequence[str, str] station_number: Station number before and after the nozzle throat
+        :param str choke_policy: Treatment of unchoked points, 'subsonic' computes the subsonic exit flow, 'nan' and
+                                 'masked' fill these points w/ NaN or mask them and 'raise' stops the calculation
         """
 
         self.inflow = inflow
@@ -39,35 +46,95 @@ class Nozzle(Stage):
             else:
                 raise ValueError('Only convergent nozzles are currently supported')
 
-    @property
+        if choke_policy in self.__choke_policies__:
+            self.choke_policy = choke_policy
+        else:
+            raise ValueError("Invalid choke policy '{}', valid entries are: {}".format(
+                choke_policy, ', '.join(self.__choke_policies__)))
+
+    @Attribute
     def p_critical(self):
         """ Critical Pressure at which the :py:class:`Nozzle` is choked in SI Pascal [Pa] """
         return ((1 - ((1 / self.eta) * ((self.inflow.kappa - 1) / (self.inflow.kappa + 1)))) **
                 (self.inflow.kappa / (self.inflow.kappa - 1))) * self.p_total
 
-    @property
+    @Attribute
     def critical_ratio(self):
         """ Pressure ratio w.r.t. the critical pressure """
         return self.p_total / self.p_critical
 
-    @property
+    @Attribute
     def choked(self):
-        """ Boolean switch case that returns ``True`` if the flow is chocked else ``False`` """
-        # TODO use isintance(self.p_total, Iterable) and create a new conditional that checks each entry in vector
-
-        @np.vectorize
-        def check(p_total, p_critical):
-            if p_total > p_critical:
-                # print('{}: Nozzle is choked! Total pressure {} [Pa]'
-                #       ' exceeds critical pressure of {} [Pa]'.format(self, self.p_total, self.p_critical))
-                return True
-            else:
-                raise ValueError('Nozzle is not choked thus the mach number at the exit is not known,'
-                                 ' stopping calculation')
+        """ Boolean mask that is ``True`` where the flow is choked, i.e. where the critical pressure is not exceeded
+        by the ambient static pressure. The mask has the (broadcast) shape of the design points.
+
+        :rtype: np.ndarray
+        """
+        choked = np.asarray(self.p_critical >= self.ambient.p_static)
+        if self.choke_policy == 'raise' and not choked.all():
+            raise ValueError('Nozzle is not choked at {} of {} point(s) thus the mach number at the exit is not'
+                             ' known, stopping calculation'.format(np.count_nonzero(~choked), choked.size))
+        return choked
+
+    def select(self, choked_value, unchoked_key):
+        """ Merges the values of a quantity at the choked and unchoked points according to :py:attr:`choke_policy`.
+        If all points are choked `choked_value` is returned as is, otherwise the subsonic values are only evaluated if
+        the 'subsonic' policy is active. Unchoked points at which the total pressure is below the ambient static
+        pressure cannot expand to the ambient, thus the 'subsonic' policy yields NaN for the exit flow and thrust of
+        these points, see :py:attr:`mach_subsonic`.
+
+        :param choked_value: Value of the quantity if the flow is choked
+        :param str unchoked_key: Name of the attribute that holds the value of the quantity if the flow is subsonic
+        """
+        choked = self.choked
+        if choked.all():
+            return choked_value
+        elif self.choke_policy == 'subsonic':
+            return where(choked, choked_value, getattr(self, unchoked_key))
+        elif self.choke_policy == 'nan':
+            return where(choked, choked_value, np.nan)
+        else:
+            return np.ma.masked_array(np.broadcast_arrays(choked_value, choked)[0], mask=~choked)
+
+    @Attribute
+    def t_subsonic(self):
+        """ Static temperature at the exit of the py:class:`Nozzle` in SI Kelvin [K] if the flow is subsonic, thus
+        expanded to the ambient static pressure w/ the nozzle efficiency :py:attr:`eta`
+
+        :rtype: float
+        """
+        k = self.inflow.kappa
+        return self.t_total * (1 - self.eta * (1 - (self.ambient.p_static / self.p_total) ** ((k - 1) / k)))
+
+    @Attribute
+    def mach_subsonic(self):
+        """ Mach number at the exit of the py:class:`Nozzle` if the flow is subsonic, NaN where the total pressure is
+        below the ambient static pressure since the flow would then have to enter the nozzle from the exit
+
+        :rtype: float
+        """
+        with np.errstate(invalid='ignore'):
+            mach = np.sqrt((2. / (self.inflow.kappa - 1.)) * ((self.t_total / self.t_subsonic) - 1.))
+        return where(self.p_total >= self.ambient.p_static, mach, np.nan)
+
+    @Attribute
+    def p_subsonic(self):
+        """ Static pressure at the exit of the py:class:`Nozzle` in SI Pascal [Pa] if the flow is subsonic, equal to
+        the ambient static pressure
 
-        return check(self.p_total, self.p_critical)
+        :rtype: float
+        """
+        return self.ambient.p_static
+
+    @Attribute
+    def mach_exit(self):
+        """ Mach number at the exit of the py:class:`Nozzle`, equal to 1.0 if the flow is choked
+
+        :rtype: float
+        """
+        return self.select(1., 'mach_subsonic')
 
-    @property
+    @Attribute
     def t_total(self):
         """ Total temperature at the end of the py:class:`Nozzle` right before the throat n SI Kelvin [K]. The total
         temperature in the nozzle remains constant.
@@ -76,15 +143,15 @@ class Nozzle(Stage):
         """
         return self.inflow.t_total
 
-    @property
+    @Attribute
     def t_exit(self):
         """ Static temperature at the exit of the py:class:`Nozzle` after the throat n SI Kelvin [K].
 
         :rtype: float
         """
-        return self.t_total * (2. / (self.inflow.kappa + 1.))
+        return self.select(self.t_total * (2. / (self.inflow.kappa + 1.)), 't_subsonic')
 
-    @property
+    @Attribute
     def p_total(self):
         """ Total pressure at the end of the py:class:`Nozzle` right before the throat in SI Kelvin [K]. The total
         temperature in the nozzle remains constant.
@@ -93,15 +160,15 @@ class Nozzle(Stage):
         """
         return self.inflow.p_total
 
-    @property
+    @Attribute
     def p_exit(self):
         """ Static temperature at the exit of the py:class:`Nozzle` after the throat n SI Kelvin [K].
 
         :rtype: float
         """
-        return self.p_total / self.critical_ratio
+        return self.select(self.p_total / self.critical_ratio, 'p_subsonic')
 
-    @property
+    @Attribute
     def throat_area(self):
         """ Cross-sectional area of the nozzle throat in SI meter squared [m^2]
 
@@ -109,7 +176,7 @@ class Nozzle(Stage):
         """
         return self.outflow.mass_flow / (self.outflow.rho * self.outflow.velocity)
 
-    @property
+    @Attribute
     def momentum_thrust(self):
         """ Thrust produced by the nozzle due to the momentum difference between the jet velocity and the ambient
         velocity in SI Newton [N]
@@ -118,7 +185,7 @@ class Nozzle(Stage):
         """
         return self.outflow.mass_flow * (self.outflow.velocity - self.ambient.velocity)
 
-    @property
+    @Attribute
     def pressure_thrust(self):
         """ Thrust produced due to the difference in static pressure between the nozzle exit and ambient conditions in
         SI Newton [N]
@@ -127,7 +194,7 @@ class Nozzle(Stage):
         """
         return self.throat_area * (self.outflow.p_static - self.ambient.p_static)
 
-    @property
+    @Attribute
     def thrust(self):
         """ Total thrust produced by the nozzle in SI Newton [N]
 
@@ -135,7 +202,7 @@ class Nozzle(Stage):
         """
         return self.momentum_thrust + self.pressure_thrust
 
-    @property
+    @Attribute
     def nozzle_flow(self):
         """ Represents the flow conditions in the nozzle before the throat """
         return FlowCondition(mass_flow=self.inflow.mass_flow,
@@ -144,11 +211,11 @@ class Nozzle(Stage):
                              medium=self.inflow.medium,
                              station_number=self.station_number[0])
 
-    @property
+    @Attribute
     def outflow(self):
         """ Represents the flow conditions after the nozzle throat """
         return FlowCondition(mass_flow=self.inflow.mass_flow,
-                             mach=1. if self.choked.any() else None,
+                             mach=self.mach_exit,
                              t_static=self.t_exit,
                              p_static=self.p_exit,
                              medium=self.inflow.medium,
@@ -3,7 +3,7 @@
 
 """ ADD DOC """
 
-from definitions import Stage, FlowCondition
+from definitions import Stage, FlowCondition, Attribute
 from collections import Iterable
 
 __author__ = 'San Kilkis'
@@ -13,6 +13,8 @@ __author__ = 'San Kilkis'
 
 class Spool(Stage):
 
+    __stations__ = ()  # A spool only transfers work between stages
+
     def __init__(self, compressor_in, eta):
         """
 
@@ -22,7 +24,7 @@ class Spool(Stage):
         self.compressor_in = compressor_in
         self.eta = eta
 
-    @property
+    @Attribute
     def work_required(self):
         """ Sums the work done by the compressor(s) from :py:attr:`compressor_in` and accounts for mechanical
         losses due to :py:attr:`eta`, thereby obtaining the work required to drive the system. This work must then
@@ -3,7 +3,7 @@
 
 """ ADD DOC """
 
-from definitions import Stage, FlowCondition
+from definitions import Stage, FlowCondition, Attribute
 import numpy as np
 
 __author__ = 'San Kilkis'
@@ -25,7 +25,7 @@ class Turbine(Stage):
         self.station_number = station_number
         self.isentropic = isentropic
 
-    @property
+    @Attribute
     def work_output(self):
         """ Convenience property that represents the work output of the :class:`Turbine` in SI Watt [W]. This quantity
         is equivalent to the work required to drive the compressor(s) on the same spool (mechanical losses are already
@@ -35,7 +35,7 @@ class Turbine(Stage):
         """
         return self.spool_in.work_required
 
-    @property
+    @Attribute
     def t_total(self):
         """ Total temperature at the end of the py:class:`Turbine` stage in SI Kelvin [K]. The temperature drop
         corresponds to the expansion process through which work can be extracted
@@ -44,7 +44,7 @@ class Turbine(Stage):
         """
         return self.inflow.t_total - (self.work_output / (self.inflow.mass_flow * self.inflow.specific_heat))
 
-    @property
+    @Attribute
     def p_total(self):
         """ Total pressure at the end of the Turbine stage in SI Pascal [Pa]. The total pressure in the system decreases
         proportionally to the decrease in total temperature
@@ -55,7 +55,7 @@ class Turbine(Stage):
                                       ((self.t_total / self.inflow.t_total) - 1.)))
                                       ** (self.inflow.kappa / (self.inflow.kappa - 1.)))
 
-    @property
+    @Attribute
     def p_isentropic(self):
         """ Total pressure at the end of the Turbine stage in SI Pascal [Pa] if the expansion process were to be
         isentropic (delta_s = 0).
@@ -65,7 +65,7 @@ class Turbine(Stage):
         return self.inflow.p_total * np.exp((self.inflow.specific_heat / self.gas_constant) *
                                             np.log(self.t_total / self.inflow.t_total))
 
-    @property
+    @Attribute
     def outflow(self):
         """ Represents the flow conditions at the end of the Turbine """
         return FlowCondition(mass_flow=self.inflow.mass_flow,
@@ -10,8 +10,6 @@ __all__ = ['Constants', 'Attribute']
 
 # working_dir = os.path.dirname(os.path.realpath(__file__))
 
-# TODO consider making use of https://docs.python.org/2/library/trace.html for dependency tracking
-
 
 class Constants(object):
 
@@ -9,8 +9,38 @@ import numpy as np
 __author__ = 'San Kilkis'
 
 
+class DependencyRecorder(object):
+    """ Transparent proxy of an instance which records the names of all attributes that are read through it """
+
+    __slots__ = ['__instance__', '__accessed__']
+
+    def __init__(self, instance):
+        self.__instance__ = instance
+        self.__accessed__ = set()
+
+    def __getattr__(self, item):
+        self.__accessed__.add(item)
+        return getattr(self.__instance__, item)
+
+
 class Component(property):
-    """ Renames the :py:class:`property` to be able to organize all engine components and retrieve them easily """
+    """ Renames the :py:class:`property` to be able to organize all engine components and retrieve them easily. The
+    returned stage is memoized in the ``__cache__`` dictionary of the owning instance such that each stage of the
+    component graph is only instantiated once per engine state. While a stage is created, the inputs and components
+    that it reads are recorded in the ``__dependencies__`` dictionary, see :py:meth:`Engine.invalidate` for its use """
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        cache = instance.__dict__.setdefault('__cache__', {})
+        name = self.fget.__name__
+        try:
+            return cache[name]
+        except KeyError:
+            recorder = DependencyRecorder(instance)
+            value = cache[name] = self.fget(recorder)
+            instance.__dict__.setdefault('__dependencies__', {})[name] = recorder.__accessed__
+            return value
 
     def __repr__(self):
         return "<'{}' {} object at {}>".format(self.fget.__name__,
@@ -140,6 +170,18 @@ class FlowCondition(Constants):
 
 class Stage(Constants):
 
+    # Registry of the attributes of a stage that hold the :py:class:`FlowCondition` of a station, in order of the flow
+    __stations__ = ('outflow', )
+
+    @property
+    def stations(self):
+        """ Flow conditions of all stations that are registered in :py:attr:`__stations__`, only these attributes are
+        evaluated
+
+        :rtype: list[FlowCondition]
+        """
+        return [getattr(self, name) for name in self.__stations__]
+
     @Attribute
     def inflow(self):
         return NotImplementedError('Implement an __init__ method to obtain the FlowCondition at the start of the stage')
@@ -108,6 +108,7 @@ def get_dir(folder_name=None):
 DIRS = {'ENGINE_DIR': get_dir('engine/data'),
         'CSV_DIR': get_dir('analysis/output'),
         'ENTROPY_TABLE_DIR': get_dir('analysis/cache/entropy_table.dat'),
+        'CACHE_DIR': get_dir('analysis/cache'),
         'FIGURE_DIR': get_dir('analysis/figures'),
         'DATA_DIR': get_dir('analysis/data')}
 
@@ -1 +1,5 @@
 from engine import Engine
+from kernel import CycleKernel
+from offdesign import OffDesign
+from table import EngineTable
+from spec import EngineSpec
@@ -4,7 +4,10 @@
 """ Contains all abstract class definitions  """
 
 from specparser import SpecParser
+from kernel import CycleKernel
+from spec import EngineSpec
 from definitions import FlowCondition, Component, Attribute
+from utils import AttrDict, AsyncWriter, DiskCache, Dual, ResultsStore, SyncWriter, design_grid, write_columns
 from components import *
 from analysis import Sensitivity, BraytonCycle
 import numpy as np
@@ -20,46 +23,117 @@ __author__ = 'San Kilkis'
 
 class Engine(SpecParser):
 
+    # Engine inputs which, when reassigned, invalidate the memoized component graph
+    __inputs__ = frozenset(SpecParser.get_spec_keys() + ['ideal_cycle', 'choke_policy'])
+
+    # Components in order of the flow through the engine, their stations are collected in this order
+    __flow_path__ = ('interface', 'inlet', 'fan', 'bypass', 'lpc', 'hpc', 'combustor', 'hpt', 'lpt', 'nozzle_core',
+                     'nozzle_bypass')
+
     def __init__(self, filename='PW4056_specs.cfg', ideal_cycle=False, design_variable=None, design_range=None,
-                 ambient=None):
+                 ambient=None, full_factorial=True, choke_policy='subsonic', spec=None, entries=None):
         """
-        :param str filename: Filename w/ extension of desired engine
+        :param str filename: Filename w/ extension of desired engine, can be ``None`` if `entries` are provided
         :param bool ideal_cycle: Toggles if the compression and expansion processes are isentropic
-        :param str design_variable: Specifies which design variable to investigate for the sensitivity analysis
-        :param np.array design_range: Optionally set a range of values for the design variable
+        :param str or collections.Sequence[str] design_variable: Specifies which design variable(s) to investigate for
+                                                                 the sensitivity analysis
+        :param np.ndarray or collections.Sequence[np.ndarray] design_range: Optionally set a range of values for each
+                                                                            design variable, ``None`` entries are
+                                                                            obtained automatically w/
+                                                                            :py:meth:`get_range`
         :param FlowCondition ambient: Specifies the flow the engine is subject to
-        :param:
+        :param bool full_factorial: Toggles if the ranges of multiple design variables are combined into a
+                                    full-factorial grid or broadcast against each other as a user-supplied grid
+        :param str choke_policy: Treatment of design points where a :py:class:`Nozzle` is not choked, either
+                                 'subsonic', 'nan', 'masked' or 'raise', see :py:meth:`Nozzle.select`
+        :param EngineSpec spec: (Optional) Specification the engine is built from w/o parsing the .cfg file, which
+                                overrules `filename`, `ideal_cycle` and `choke_policy` as well as the ambient state if
+                                no `ambient` is provided
+        :param entries: (Optional) Specification in memory w/ the same entries as a .cfg file, which is used instead
+                        of the file, i.e. ``Engine(filename=None, entries={'mach': 0.8, ...})``, see
+                        :py:meth:`SpecReader.load`
+        :type entries: collections.Mapping or np.void or np.ndarray
         """
-
-        super(Engine, self).__init__(filename)
+        if spec is not None:
+            filename, ideal_cycle, choke_policy = spec.filename, spec.ideal_cycle, spec.choke_policy
+            entries = spec if filename is None else entries  # Specifications in memory have no file to read from
+
+        super(Engine, self).__init__(filename, entries=entries)
+        if spec is not None:  # Resolving the inputs directly from the specification, hence nothing is invalidated
+            self.__dict__.update((key, spec[key]) for key in spec.__fields__ if key not in spec.__ambient__)
+            self.__dict__['component_maps'] = spec.maps()
+            ambient = spec.ambient if ambient is None else ambient
         self.ideal_cycle = ideal_cycle
+        self.choke_policy = choke_policy
         self.design_variable = design_variable
         self.ambient = ambient if ambient is not None else self.ambient
         self.original_index = None
 
-        self.args = (filename, ideal_cycle, design_variable, design_range, ambient)
-
         # Converting Engine to be an ideal cycle
         if self.ideal_cycle:
             self.make_ideal()
 
         # Setting-up a range of design_variable values for the Sensitivity Analysis
-        if design_variable is not None:
+        if design_variable is None:
+            self.design_range = design_range  # Sets to default value of None
+        elif isinstance(design_variable, basestring):
             if design_range is None:
-                self.design_range = self.get_range()
+                self.design_range, self.original_index = self.get_range()
             else:
-                try:
-                    ndim = design_range.ndim
-                    if ndim == 1:
-                        self.design_range = design_range
-                    else:
-                        raise ValueError("A {}D array for 'design_range' was provided,"
-                                         " only 1D arrays are supported".format(ndim))
-                except AttributeError:
-                    raise AttributeError("'design_range' must be a 1D numpy array for the vectorized process")
+                self.design_range = self.check_range(design_range)
             setattr(self, design_variable, self.design_range)  # Setting passed or created range for the design_variable
         else:
-            self.design_range = design_range  # Sets to default value of None
+            # Multiple design variables are broadcast into an N-D grid, outputs will have the shape of this grid
+            design_range = [None] * len(design_variable) if design_range is None else design_range
+            if len(design_range) != len(design_variable):
+                raise ValueError("{} ranges were provided for {} design variables".format(len(design_range),
+                                                                                        len(design_variable)))
+            ranges, indices = [], []
+            for variable, entry in zip(design_variable, design_range):
+                values, index = self.get_range(variable) if entry is None else (self.check_range(entry), None)
+                ranges.append(values)
+                indices.append(index)
+
+            self.original_index = tuple(indices)
+            self.design_range = design_grid(ranges, full_factorial=full_factorial)
+            for variable, grid in zip(design_variable, self.design_range):
+                setattr(self, variable, grid)
+
+    def __setattr__(self, key, value):
+        """ Invalidates the memoized component graph if an engine input that has already been resolved is reassigned,
+        inputs that are lazily evaluated for the first time by :py:class:`Attribute` do not trigger invalidation. The
+        stages obtain the mass flow through :py:attr:`ambient`, hence a resolved ambient condition is rebuilt w/ a
+        reassigned `corrected_mass_flow` """
+        invalidate = key in self.__inputs__ and key in self.__dict__
+        super(Engine, self).__setattr__(key, value)
+        if invalidate:
+            self.invalidate(key)
+        if key == 'corrected_mass_flow' and 'ambient' in self.__dict__:
+            kwargs = dict(self.ambient.__kwargs__, corrected_mass_flow=value)
+            kwargs.pop('mass_flow', None)
+            self.ambient = FlowCondition(**kwargs)
+
+    def invalidate(self, key=None):
+        """ Clears the memoized component graph such that stages are re-evaluated upon the next access. If an input
+        `key` is provided, only the stages which (transitively) depend on it are cleared, i.e. changing `bypass_ratio`
+        leaves the inlet and fan untouched.
+
+        :param str key: (Optional) Name of the engine input that changed, if ``None`` the whole graph is cleared
+        """
+        if key is None:
+            self.__dict__.pop('__cache__', None)
+            self.__dict__.pop('__dependencies__', None)
+            return
+
+        cache, dependencies = self.__dict__.get('__cache__', {}), self.__dict__.get('__dependencies__', {})
+        dirty, n_dirty = {key}, 0
+        while len(dirty) != n_dirty:  # Propagating through the graph until no new dirty stages are found
+            n_dirty = len(dirty)
+            dirty.update([name for name, accessed in dependencies.items() if not accessed.isdisjoint(dirty)])
+
+        for name in dirty:
+            cache.pop(name, None)
+            dependencies.pop(name, None)
 
     def make_ideal(self):
         """ Sets all efficiencies as well as the pressure ratio in the combustion chamber to 1.0 """
@@ -68,21 +142,38 @@ class Engine(SpecParser):
         for entry in ideal_attrs:
             setattr(self, entry, 1.0)
 
-    def get_range(self):
-        """ Automatically obtains sensitivity analysis range for a variable if :py:attr:`design_range` is ``None`` """
-        current_value = getattr(self, self.design_variable)
+    @staticmethod
+    def check_range(design_range):
+        """ Ensures that a provided design range is a numeric array for the vectorized process
+
+        :param np.ndarray design_range: Values of a design variable, can be N-D
+        :rtype: np.ndarray
+        """
+        try:
+            return np.asarray(design_range, dtype=float)
+        except (TypeError, ValueError):
+            raise ValueError("'design_range' must be a numeric numpy array for the vectorized process")
+
+    def get_range(self, design_variable=None):
+        """ Automatically obtains sensitivity analysis range for a variable if :py:attr:`design_range` is ``None``
+
+        :param str design_variable: (Optional) Variable to obtain the range of, defaults to :py:attr:`design_variable`
+        :return: Range of values and the index of the current value within it (``None`` for efficiencies)
+        :rtype: tuple[np.ndarray, int]
+        """
+        design_variable = self.design_variable if design_variable is None else design_variable
+        current_value = getattr(self, design_variable)
         n = 50
-        if 'eta' in self.design_variable:
+        if 'eta' in design_variable:
             upper = 1.0
             lower = 0.9
-            return np.linspace(lower, upper, n)
+            return np.linspace(lower, upper, n), None
         else:
             upper = 1.1 * current_value
             lower = 0.9 * current_value
             lower_range, step = np.linspace(lower, current_value, n // 2, retstep=True)
             upper_range = np.arange(current_value, upper, step)[1:]  # Ensures that current_value is present in output
-            self.original_index = len(lower_range) - 1  # Updates w/ index of current_value
-            return np.append(lower_range, upper_range)
+            return np.append(lower_range, upper_range), len(lower_range) - 1  # Index of current_value
 
     @Component
     def interface(self):
@@ -161,7 +252,8 @@ class Engine(SpecParser):
                       ambient=self.ambient,
                       eta=self.eta_nozzle,
                       nozzle_type=self.nozzle_type,
-                      station_number=('7', '8'))
+                      station_number=('7', '8'),
+                      choke_policy=self.choke_policy)
 
     @Component
     def nozzle_bypass(self):
@@ -169,7 +261,8 @@ class Engine(SpecParser):
                       ambient=self.ambient,
                       eta=self.eta_nozzle,
                       nozzle_type=self.nozzle_type,
-                      station_number=('16', '18'))
+                      station_number=('16', '18'),
+                      choke_policy=self.choke_policy)
 
     # TODO make this more general, able to cope with less nozzles (maybe not bypassed)
 
@@ -183,6 +276,160 @@ class Engine(SpecParser):
         """ Thrust Specific Fuel Consumption (TSFC) in SI gram per kilo-Newton second [g/kN s] """
         return (self.combustor.fuel_flow / self.thrust) * 1e6
 
+    @property
+    def choke_mask(self):
+        """ Boolean masks of the core and bypass :py:class:`Nozzle` that are ``True`` where the flow is choked
+
+        :rtype: AttrDict
+        """
+        return AttrDict({'core': self.nozzle_core.choked, 'bypass': self.nozzle_bypass.choked})
+
+    @property
+    def specs(self):
+        """ Current values of all :py:class:`CycleKernel` inputs of the engine, the ambient state variables are taken
+        from :py:attr:`ambient` such that a custom ambient condition is respected
+
+        :rtype: dict
+        """
+        specs = {key: getattr(self, key) for key in CycleKernel.__inputs__ if key in self.get_spec_keys()}
+        specs.update({key: getattr(self.ambient, key) for key in ('mach', 'p_static', 't_static',
+                                                                   'corrected_mass_flow')})
+        return specs
+
+    @property
+    def spec(self):
+        """ Immutable snapshot of the current inputs, options and ambient state of the engine, from which variants
+        are built w/ ``Engine(spec=engine.spec.replace(**overrides))``
+
+        :rtype: EngineSpec
+        """
+        specs = self.specs
+        return EngineSpec({key: specs[key] for key in CycleKernel.__inputs__},
+                          nozzle_type=self.nozzle_type,
+                          pr_ovr=self.pr_ovr,
+                          component_maps=self.component_maps,
+                          filename=self.filename if self.entries is None else None,
+                          ideal_cycle=self.ideal_cycle,
+                          choke_policy=self.choke_policy)
+
+    def compile(self):
+        """ Flattens the component chain of the engine into a single vectorized :py:class:`CycleKernel` which uses
+        the current engine inputs as defaults. Calling the kernel w/ (arrays of) overrides then evaluates all design
+        points at once without instantiating any :py:class:`FlowCondition` or stage objects, i.e.:
+
+        >>> kernel = Engine(filename='GENX.cfg').compile()
+        >>> kernel(pr_fan=np.linspace(1.4, 1.8, 50)).thrust
+
+        :rtype: CycleKernel
+        """
+        if self.nozzle_type not in ('convergent', None):
+            raise ValueError('Only convergent nozzles are currently supported')
+        return CycleKernel(ideal_cycle=self.ideal_cycle, defaults=self.specs, choke_policy=self.choke_policy)
+
+    def sweep(self, processes=None, chunk_size=None, header=None):
+        """ Evaluates the design grid of the engine, i.e. the current (array) inputs, w/ the compiled
+        :py:class:`CycleKernel` split over a pool of worker processes, see :py:meth:`CycleKernel.map`
+
+        :param int processes: (Optional) Number of worker processes, defaults to the number of CPU cores
+        :param int chunk_size: (Optional) Number of design points per task
+        :param str header: (Optional) Header of the progress bar
+        :return: Thrust, sfc, fuel flow, station quantities and choke masks over the full design grid
+        :rtype: AttrDict
+        """
+        return self.compile().map(processes=processes, chunk_size=chunk_size, header=header)
+
+    def evaluate(self, cache=None):
+        """ Outputs of the compiled :py:class:`CycleKernel` broadcast to the design grid. If a :py:class:`DiskCache`
+        is provided the outputs are memoized under a hash of the resolved specification (all kernel inputs including
+        the ambient state), the nozzle type, the ideal cycle flag, the choke policy and the version of the relations
+        :py:attr:`CycleKernel.__version__`, thus a repeated evaluation in any process is only a look-up. The returned
+        outputs are shared between hits and should not be modified.
+
+        :param DiskCache or bool cache: (Optional) Cache of the evaluations, ``True`` uses the `evaluations` cache in
+                                        the cache directory
+        :return: Thrust, sfc, fuel flow, station quantities and choke masks
+        :rtype: AttrDict
+        """
+        if cache is None or cache is False:
+            return self.compile().map(processes=1)
+        cache = DiskCache(os.path.join(DIRS['CACHE_DIR'], 'evaluations')) if cache is True else cache
+        key = cache.key(specs=self.specs,
+                        nozzle_type=self.nozzle_type,
+                        ideal_cycle=bool(self.ideal_cycle),
+                        choke_policy=self.choke_policy,
+                        version=CycleKernel.__version__)
+        results = cache.get(key)
+        if results is None:
+            results = self.compile().map(processes=1)
+            cache.put(key, results)
+        return results
+
+    def stream(self, memory_budget=2 ** 28, chunk_size=None):
+        """ Evaluates the design grid of the engine in chunks that fit within `memory_budget`, see
+        :py:meth:`CycleKernel.stream`
+
+        :param int memory_budget: Approximate memory of a single chunk in SI byte [B]
+        :param int chunk_size: (Optional) Number of design points per chunk, overrides `memory_budget`
+        :return: Slice of each chunk within the flattened design grid and the outputs of its design points
+        :rtype: collections.Iterator[tuple[slice, AttrDict]]
+        """
+        return self.compile().stream(memory_budget=memory_budget, chunk_size=chunk_size)
+
+    def write_store(self, directory=None, memory_budget=2 ** 28, max_queue=2):
+        """ Evaluates the design grid of the engine w/ :py:meth:`stream` and writes the inputs, outputs, station
+        data and choke masks to a binary :py:class:`ResultsStore` together w/ the engine name, the hash of its
+        specification and the ideal/real flag as metadata. Chunks are written by an :py:class:`AsyncWriter` while
+        the next chunk is evaluated, thus at most `max_queue` + 2 chunks are held in memory.
+
+        :param str directory: (Optional) Path of the store, defaults to `<engine>_results` in the CSV directory
+        :param int memory_budget: Approximate memory of a single chunk in SI byte [B]
+        :param int max_queue: Maximum number of evaluated chunks that are waiting to be written
+        :rtype: ResultsStore
+        """
+        store = ResultsStore(directory if directory is not None else
+                             os.path.join(DIRS['CSV_DIR'], '{}_results'.format(self.__name__)))
+        specs = self.specs
+        shape = np.broadcast(*[np.asarray(getattr(value, 'value', value)) for value in specs.values()]).shape
+        store.clear()  # Arrays of a previous run in the same directory must not outlive the new results
+        store.write(specs, prefix='inputs')
+        with AsyncWriter(max_queue=max_queue) as writer:
+            for chunk, out in self.stream(memory_budget=memory_budget):
+                writer.submit(store.write_chunk, out, chunk, shape)
+            writer.submit(store.flush)
+        store.write_metadata(engine=self.__name__,
+                             spec_hash=ResultsStore.digest(specs),
+                             ideal_cycle=bool(self.ideal_cycle),
+                             choke_policy=self.choke_policy,
+                             shape=list(shape))
+        return store
+
+    def differentiate(self, wrt=None):
+        """ Seeds the engine inputs `wrt` w/ :py:class:`Dual` numbers, thus all quantities that are evaluated
+        afterwards, i.e. :py:attr:`thrust`, :py:attr:`sfc` or any station quantity, carry their exact derivatives
+        w.r.t. these inputs (forward-mode automatic differentiation):
+
+        >>> engine = Engine(filename='GENX.cfg').differentiate()
+        >>> engine.thrust.gradient.pr_fan
+
+        :param collections.Sequence[str] wrt: (Optional) Inputs to differentiate w.r.t., defaults to all inputs of
+                                              :py:class:`CycleKernel` including the ambient state variables
+        :return: The current engine to allow chaining
+        :rtype: Engine
+        """
+        specs = self.specs
+        seeds = Dual.seed(**{key: specs[key] for key in (CycleKernel.__inputs__ if wrt is None else wrt)})
+
+        # The ambient state variables and mass flow enter the component chain through the ambient FlowCondition
+        ambient_keys = ('mach', 'p_static', 't_static', 'corrected_mass_flow')
+        for key, value in seeds.items():
+            if key not in ambient_keys or key == 'corrected_mass_flow':
+                setattr(self, key, value)
+        if any(key in seeds for key in ambient_keys):
+            self.ambient = FlowCondition(medium='air',
+                                         station_number='0',
+                                         **{key: seeds.get(key, specs[key]) for key in ambient_keys})
+        return self
+
     def calculate_cycle(self):
         """ Plots the T-S Diagram for the current engine and displays it on screen """
         BraytonCycle(self).plot()
@@ -194,58 +441,64 @@ class Engine(SpecParser):
         analysis.plot_param()
         analysis.plot_eta()
 
-    # TODO make this method more stable, right now access to super-class is not dynamic
     def get_eta_keys(self):
-        """ Provides a list of all efficiency keys by accessing the superclass :py:class:`SpecParser` dictionary
+        """ Provides a list of all efficiency keys by filtering the specification keys of :py:class:`SpecParser`
 
         :rtype: list[str]
         """
-        return [key for key in vars(self.__class__.__bases__[0]).keys() if 'eta' in key]
+        return [key for key in self.get_spec_keys() if 'eta' in key]
+
+    @property
+    def stations(self):
+        """ Flow conditions of all stations registered by the stages along :py:attr:`__flow_path__`, if two stages
+        register the same station number the first one along the flow path is retained
+
+        :rtype: dict[str, FlowCondition]
+        """
+        stations = {}
+        for name in self.__flow_path__:
+            for flow_condition in getattr(self, name).stations:
+                stations.setdefault(flow_condition.station_number, flow_condition)
+        return stations
+
+    def station_data(self, station_list=('2', '21', '13', '18', '25', '3', '4', '45', '5', '7', '8'),
+                     static_list=('8', '18')):
+        """ Columns of the pressure, temperature and mass flow at each selected station, each broadcast to the shape
+        of the design grid and flattened to one entry per design point
+
+        :param collections.Sequence[str] station_list: Stations at which output values are desired
+        :param collections.Sequence[str] static_list: Stations at which static rather than total values are desired
+        :return: Column names and the values of all columns w/ shape (design points, columns)
+        :rtype: tuple[list[str], np.ndarray]
+        """
+        stations = self.stations
+        missing = [key for key in station_list if key not in stations]
+        if missing:
+            raise KeyError('The following stations are not present in the engine: {}'.format(', '.join(missing)))
+
+        names, columns = [], []
+        for key in station_list:
+            flow_condition, state = stations[key], 'static' if key in static_list else 'total'
+            names += ['p_{}_{}'.format(state, key), 't_{}_{}'.format(state, key), 'mass_flow_{}'.format(key)]
+            columns += [getattr(flow_condition, 'p_{}'.format(state)), getattr(flow_condition, 't_{}'.format(state)),
+                        flow_condition.mass_flow]
+        columns = np.broadcast_arrays(*[np.ma.filled(np.ma.asarray(column, dtype=float), np.nan) for column in columns])
+        return names, np.column_stack([column.ravel() for column in columns])
 
     def write_csv(self, station_list=('2', '21', '13', '18', '25', '3', '4', '45', '5', '7', '8'),
-                  static_list=('8', '18')):
-        """ Writes an output .csv file containing relevant parameters at each selected station.
+                  static_list=('8', '18'), writer=None):
+        """ Writes an output .csv file w/ one row per design point and a group of pressure, temperature and mass flow
+        columns for each selected station. The stations are obtained from the registry of each stage, hence no other
+        quantities are evaluated, and all rows are formatted in bulk by :py:func:`write_columns`.
 
         :param list station_list: Stations at which output values are desired
         :param list static_list: Stations at which static pressure is desired
-        :return:
+        :param AsyncWriter writer: (Optional) Writer that serializes the file, i.e. an :py:class:`AsyncWriter` to
+                                   write in the background, defaults to a synchronous :py:class:`SyncWriter`
         """
-        components = self.get_components(output='keys')
-        station_dict = {}
-        still_to_find = list(station_list) if type(station_list) == tuple else station_list[:]  # Copying w/ slice
-
-        # First pass retrieves un-ordered keys
-        def get_values(flow_condition, args):
-            _still_to_find, _static_list, _station_dict = args
-            try:
-                station_number = flow_condition.station_number
-                if station_number in _still_to_find:
-                    _still_to_find.pop(_still_to_find.index(station_number))
-                    if station_number in static_list:
-                        _station_dict[station_number] = (station_number,
-                                                         flow_condition.p_static,
-                                                         flow_condition.t_static,
-                                                         flow_condition.mass_flow)
-                    else:
-                        _station_dict[station_number] = (station_number,
-                                                         flow_condition.p_total,
-                                                         flow_condition.t_total,
-                                                         flow_condition.mass_flow)
-            except AttributeError:
-                pass
-
-        for i, component in enumerate(components):
-            keys = set(vars(getattr(self, component).__class__).keys() + vars(getattr(self, component)).keys())
-            attributes = [getattr(getattr(self, component), key) for key in keys]
-            for attribute in attributes:
-                if isinstance(attribute, FlowCondition):
-                    get_values(attribute, args=(still_to_find, static_list, station_dict))
-
-        # Second pass writes ordered .csv file
-        with open(os.path.join(DIRS['CSV_DIR'], '{}_station_data.csv'.format(self.__name__)), "w") as csv:
-            for key in station_list:
-                station, p, t, m_dot = station_dict[key]
-                csv.write('{}, {}, {}, {}\n'.format(station, p, t, m_dot))
+        names, data = self.station_data(station_list, static_list)
+        (writer or SyncWriter()).submit(write_columns, os.path.join(
+            DIRS['CSV_DIR'], '{}_station_data.csv'.format(self.__name__)), names, data)
 
     def get_children(self, component_type=Component):
         """ Fetches all :py:class:`Component` of the current :py:class:`Engine`. Optional argument `component_type`
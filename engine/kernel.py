@@ -0,0 +1,342 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" Contains a flattened, vectorized version of the :py:class:`Engine` component chain for batched evaluation """
+
+from __future__ import division
+from constants import *
+from utils import AttrDict
+from utils.dual import where
+from utils.parallel import ParallelExecutor, split
+from components import Nozzle
+import numpy as np
+
+__author__ = 'San Kilkis'
+
+
+class CycleKernel(Constants):
+
+    # Version of the cycle relations, which is part of the key of memoized evaluations and has to be incremented
+    # whenever a change to the relations alters the outputs
+    __version__ = 1
+
+    # Specification keys of :py:class:`SpecParser` that enter the kernel, the ambient condition is split into its
+    # static state variables w/ the mass flow being provided through `corrected_mass_flow`
+    __inputs__ = ('mach', 'p_static', 't_static', 'corrected_mass_flow', 'bypass_ratio', 'combustion_temperature',
+                  'pr_cc', 'pr_fan', 'pr_lpc', 'pr_hpc', 'eta_inlet', 'eta_fan', 'eta_lpc', 'eta_hpc', 'eta_cc',
+                  'eta_mech', 'eta_hpt', 'eta_lpt', 'eta_nozzle')
+
+    def __init__(self, ideal_cycle=False, defaults=None, choke_policy='subsonic'):
+        """ Evaluates the design point of a two-spool separate-flow turbofan in a single pass of flat array
+        operations. The relations are identical to those of the stages in :py:mod:`components` as they are chained by
+        :py:class:`Engine` (interface, inlet, fan, bypass, lpc, hpc, combustor, spools, hpt, lpt and both nozzles),
+        however no :py:class:`FlowCondition` or stage objects are created. All inputs are broadcast against each other,
+        thus any combination of scalars and (N-D) arrays is accepted. Inputs can also be :py:class:`Dual` numbers to
+        obtain exact derivatives of all outputs.
+
+        :param bool ideal_cycle: Toggles if the compression and expansion processes are isentropic
+        :param dict defaults: (Optional) Default values for the kernel inputs, i.e. those of an :py:class:`Engine`
+        :param str choke_policy: Treatment of unchoked nozzle points, see :py:meth:`Nozzle.select`
+        """
+        if choke_policy not in Nozzle.__choke_policies__:
+            raise ValueError("Invalid choke policy '{}', valid entries are: {}".format(
+                choke_policy, ', '.join(Nozzle.__choke_policies__)))
+        self.ideal_cycle = ideal_cycle
+        self.defaults = dict(defaults) if defaults is not None else {}
+        self.choke_policy = choke_policy
+
+    def __repr__(self):
+        return "<{} {} object at {}>".format('Ideal' if self.ideal_cycle else 'Real',
+                                             self.__class__.__name__,
+                                             hex(id(self)))
+
+    def __call__(self, inputs=None, **kwargs):
+        """ Evaluates the kernel for the provided struct-of-arrays inputs
+
+        :param inputs: (Optional) Mapping or structured :py:class:`numpy.ndarray` w/ the inputs as keys/fields
+        :param kwargs: Inputs provided as keyword arguments, these take precedence over `inputs`
+        :rtype: AttrDict
+        """
+        return self.evaluate(**self.collect(inputs, **kwargs))
+
+    def map(self, inputs=None, processes=None, chunk_size=None, header=None, **kwargs):
+        """ Evaluates the kernel for the provided inputs split over a pool of worker processes. All inputs are
+        broadcast to a common shape and flattened, contiguous chunks of points are then evaluated by the workers and
+        reassembled in their original order, thus the result is identical to that of :py:meth:`__call__` w/ each
+        quantity broadcast to the full shape of the inputs.
+
+        :param inputs: (Optional) Mapping or structured :py:class:`numpy.ndarray` w/ the inputs as keys/fields
+        :param int processes: (Optional) Number of worker processes, defaults to the number of CPU cores
+        :param int chunk_size: (Optional) Number of points per task, defaults to an even split over all processes
+        :param str header: (Optional) Header of the :py:class:`ProgressBar` that aggregates the progress of all workers
+        :param kwargs: Inputs provided as keyword arguments, these take precedence over `inputs`
+        :rtype: AttrDict
+        """
+        specs = self.collect(inputs, **kwargs)
+        keys = list(specs.keys())
+        values = np.broadcast_arrays(*[np.asarray(specs[key], dtype=float) for key in keys])
+        shape = values[0].shape
+        flat = [value.ravel() for value in values]
+
+        executor = ParallelExecutor(processes=processes, header=header)
+        chunks = split(flat[0].size, executor.processes, chunk_size) or [slice(0, 0)]  # An empty grid is one chunk
+        # Tasks only carry the options of the kernel w/o its defaults, which can hold the arrays of the full grid
+        results = executor.map(_evaluate, [(self.ideal_cycle, self.choke_policy,
+                                            {key: value[chunk] for key, value in zip(keys, flat)}) for chunk in chunks])
+        return self.merge(results, [chunk.stop - chunk.start for chunk in chunks], shape)
+
+    def stream(self, inputs=None, memory_budget=2 ** 28, chunk_size=None, **kwargs):
+        """ Generator that evaluates the kernel for the provided inputs in consecutive chunks of the flattened design
+        grid. The inputs are only broadcast as views and the inputs of a chunk are gathered by their indices, thus
+        neither the full grid nor the results of more than one chunk are held in memory at any time. Each chunk is
+        meant to be consumed, i.e. by a :py:class:`ResultsStore` or :py:class:`StreamingStatistics`, before the next
+        one is computed:
+
+        >>> for chunk, out in Engine(filename='GENX.cfg').compile().stream(pr_fan=np.linspace(1.4, 1.8, int(1e8))):
+        ...     statistics.update(out.thrust)
+
+        :param inputs: (Optional) Mapping or structured :py:class:`numpy.ndarray` w/ the inputs as keys/fields
+        :param int memory_budget: Approximate memory that a single chunk is allowed to occupy in SI byte [B]
+        :param int chunk_size: (Optional) Number of points per chunk, overrides the one obtained from `memory_budget`
+        :param kwargs: Inputs provided as keyword arguments, these take precedence over `inputs`
+        :return: Slice of each chunk within the flattened grid and the outputs of its points, each quantity is
+                 broadcast to the length of the chunk
+        :rtype: collections.Iterator[tuple[slice, AttrDict]]
+        """
+        specs = self.collect(inputs, **kwargs)
+        keys = list(specs.keys())
+        values = np.broadcast_arrays(*[np.asarray(specs[key], dtype=float) for key in keys])
+        shape = values[0].shape if values[0].ndim else (1, )
+        values = [value.reshape(shape) for value in values]
+        size = int(np.prod(shape))
+        chunk_size = self.points_per_chunk(memory_budget) if chunk_size is None else int(chunk_size)
+        if chunk_size < 1:
+            raise ValueError('The chunk size must be a positive integer')
+
+        for start in range(0, size, chunk_size):
+            chunk = slice(start, min(start + chunk_size, size))
+            index = np.unravel_index(np.arange(chunk.start, chunk.stop), shape)
+            out = self.evaluate(**{key: value[index] for key, value in zip(keys, values)})
+            yield chunk, self.merge([out], [chunk.stop - chunk.start], (chunk.stop - chunk.start, ))
+
+    def points_per_chunk(self, memory_budget):
+        """ Number of points of which the inputs, outputs and intermediate arrays fit within `memory_budget`. The
+        intermediate arrays of :py:meth:`evaluate` are estimated as twice the number of outputs, which are counted by
+        evaluating a single point, hence (array) defaults of the full design grid are never evaluated at once.
+
+        :param int memory_budget: Memory in SI byte [B]
+        :rtype: int
+        """
+        def count(results):
+            return sum(count(value) if isinstance(value, dict) else 1 for value in results.values())
+
+        def first(value):
+            value = np.ravel(getattr(value, 'value', value))
+            return float(value[0]) if value.size else 1.
+
+        with np.errstate(all='ignore'):
+            outputs = count(self.evaluate(**{key: first(self.defaults.get(key, 1.)) for key in self.__inputs__}))
+        return max(1, int(memory_budget // (8 * (len(self.__inputs__) + 3 * outputs))))
+
+    @classmethod
+    def merge(cls, results, sizes, shape):
+        """ Reassembles the (nested) results of flat chunks w/ the provided `sizes` into arrays of `shape`
+
+        :param list results: Results of :py:meth:`evaluate` in order of the chunks
+        :param list[int] sizes: Number of points in each of the chunks
+        :param tuple shape: Broadcast shape of the inputs
+        """
+        if isinstance(results[0], dict):
+            return AttrDict({key: cls.merge([result[key] for result in results], sizes, shape)
+                             for key in results[0].keys()})
+        masked = any(isinstance(result, np.ma.MaskedArray) for result in results)
+        concatenate = np.ma.concatenate if masked else np.concatenate
+        return concatenate([np.ma.resize(result, size) if masked else np.broadcast_to(result, (size, ))
+                            for result, size in zip(results, sizes)]).reshape(shape)
+
+    def collect(self, inputs=None, **kwargs):
+        """ Merges the :py:attr:`defaults` w/ the provided inputs into a single dictionary of kernel inputs
+
+        :param inputs: (Optional) Mapping or structured :py:class:`numpy.ndarray` w/ the inputs as keys/fields
+        :rtype: dict
+        """
+        specs = dict(self.defaults)
+        if inputs is not None:
+            keys = inputs.dtype.names if isinstance(inputs, np.ndarray) else inputs.keys()
+            specs.update((key, inputs[key]) for key in keys)
+        specs.update(kwargs)
+
+        missing = [key for key in self.__inputs__ if key not in specs]
+        if missing:
+            raise KeyError('The following kernel inputs were not provided: {}'.format(', '.join(missing)))
+        return {key: specs[key] for key in self.__inputs__}
+
+    def evaluate(self, mach, p_static, t_static, corrected_mass_flow, bypass_ratio, combustion_temperature, pr_cc,
+                 pr_fan, pr_lpc, pr_hpc, eta_inlet, eta_fan, eta_lpc, eta_hpc, eta_cc, eta_mech, eta_hpt, eta_lpt,
+                 eta_nozzle):
+        """ Flattened cycle calculation, see the corresponding stages in :py:mod:`components` for documentation of
+        the individual relations. Note that each returned quantity only carries the broadcast shape of the inputs that
+        it depends on, e.g. the inlet conditions do not vary w/ `pr_hpc`.
+
+        :return: Thrust in SI Newton [N], TSFC in SI gram per kilo-Newton second [g/kN s], fuel flow in SI kilogram
+                 per second [kg/s], the total conditions at every station and the choke mask of both nozzles
+        :rtype: AttrDict
+        """
+        # Localizing constants
+        R, k_a, k_g, cp_g = self.gas_constant, self.kappa_air, self.kappa_gas, self.specific_heat_gas
+        isentropic = self.ideal_cycle
+
+        # Station 0/1: Ambient Interface
+        t_ratio = 1 + (((k_a - 1) / 2.) * mach ** 2)
+        t_0 = t_static * t_ratio
+        p_0 = p_static * t_ratio ** (k_a / (k_a - 1))
+        m_0 = corrected_mass_flow * (p_0 / self.pressure_sl) / np.sqrt(t_0 / self.temperature_sl)
+        v_0 = mach * np.sqrt(k_a * R * t_static)
+
+        # Station 2: Inlet
+        t_2 = t_0
+        p_2 = p_static * (1 + (eta_inlet * ((k_a - 1) / 2.) * mach ** 2)) ** (k_a / (k_a - 1))
+
+        # Station 21: Fan
+        t_21, p_21, work_fan = self.compress(t_2, p_2, m_0, pr_fan, eta_fan, isentropic)
+
+        # Station 21/13: Bypass
+        m_core = m_0 / (bypass_ratio + 1.)
+        m_bypass = m_core * bypass_ratio
+
+        # Station 25 & 3: Low and High-Pressure Compressor
+        t_25, p_25, work_lpc = self.compress(t_21, p_21, m_core, pr_lpc, eta_lpc, isentropic)
+        t_3, p_3, work_hpc = self.compress(t_25, p_25, m_core, pr_hpc, eta_hpc, isentropic)
+
+        # Station 4: Combustion Chamber
+        fuel_flow = (m_core * cp_g * (combustion_temperature - t_3)) / (eta_cc * self.lower_heating_value)
+        t_4 = combustion_temperature
+        p_4 = p_3 * pr_cc
+        m_4 = m_core + fuel_flow
+
+        # Station 45 & 5: High and Low-Pressure Turbine driving the HP and LP Spool respectively
+        t_45, p_45 = self.expand(t_4, p_4, m_4, work_hpc / eta_mech, eta_hpt, isentropic)
+        t_5, p_5 = self.expand(t_45, p_45, m_4, (work_fan + work_lpc) / eta_mech, eta_lpt, isentropic)
+
+        # Station 7/8 & 16/18: Core and Bypass Nozzle
+        core = self.nozzle(t_5, p_5, m_4, k_g, eta_nozzle, v_0, p_static)
+        bypass = self.nozzle(t_21, p_21, m_bypass, k_a, eta_nozzle, v_0, p_static)
+
+        thrust = core.thrust + bypass.thrust
+
+        def station(t_total, p_total, mass_flow, **kwargs):
+            return AttrDict(dict(t_total=t_total, p_total=p_total, mass_flow=mass_flow, **kwargs))
+
+        stations = AttrDict({'0': station(t_0, p_0, m_0, t_static=t_static, p_static=p_static, velocity=v_0),
+                             '1': station(t_0, p_0, m_0),
+                             '2': station(t_2, p_2, m_0),
+                             '21': station(t_21, p_21, m_0),
+                             '13': station(t_21, p_21, m_bypass),
+                             '25': station(t_25, p_25, m_core),
+                             '3': station(t_3, p_3, m_core),
+                             '4': station(t_4, p_4, m_4),
+                             '45': station(t_45, p_45, m_4),
+                             '5': station(t_5, p_5, m_4),
+                             '7': station(t_5, p_5, m_4),
+                             '8': core.exit,
+                             '16': station(t_21, p_21, m_bypass),
+                             '18': bypass.exit})
+
+        return AttrDict(dict(thrust=thrust,
+                             sfc=(fuel_flow / thrust) * 1e6,
+                             fuel_flow=fuel_flow,
+                             stations=stations,
+                             choked=AttrDict({'core': core.choked, 'bypass': bypass.choked})))
+
+    def compress(self, t_in, p_in, mass_flow, pressure_ratio, eta, isentropic=False):
+        """ Flattened :py:class:`Compressor` (and :py:class:`Fan`) relations, air is the working medium
+
+        :return: Total temperature and pressure at the end of the stage as well as the work done on the flow
+        :rtype: tuple
+        """
+        k, cp = self.kappa_air, self.specific_heat_air
+        t_total = t_in * (1 + (pressure_ratio ** ((k - 1) / k) - 1) / eta)
+        p_total = p_in * pressure_ratio
+        work_done = mass_flow * cp * (t_total - t_in)
+        if isentropic:
+            t_total = t_in * np.exp((self.gas_constant / cp) * np.log(p_total / p_in))
+        return t_total, p_total, work_done
+
+    def expand(self, t_in, p_in, mass_flow, work_output, eta, isentropic=False):
+        """ Flattened :py:class:`Turbine` relations, gas is the working medium
+
+        :return: Total temperature and pressure at the end of the stage
+        :rtype: tuple
+        """
+        k, cp = self.kappa_gas, self.specific_heat_gas
+        t_total = t_in - (work_output / (mass_flow * cp))
+        if isentropic:
+            p_total = p_in * np.exp((cp / self.gas_constant) * np.log(t_total / t_in))
+        else:
+            p_total = p_in * ((1. + ((1. / eta) * ((t_total / t_in) - 1.))) ** (k / (k - 1.)))
+        return t_total, p_total
+
+    def nozzle(self, t_total, p_total, mass_flow, kappa, eta, v_0, p_ambient):
+        """ Flattened convergent :py:class:`Nozzle` relations, unchoked points are treated according to
+        :py:attr:`choke_policy`. As in :py:meth:`Nozzle.select` the 'subsonic' policy yields NaN where the total
+        pressure is below the ambient static pressure.
+
+        :return: Thrust of the nozzle in SI Newton [N], the choke mask and the flow conditions at the exit
+        :rtype: AttrDict
+        """
+        k, R = kappa, self.gas_constant
+        p_exit = ((1 - ((1 / eta) * ((k - 1) / (k + 1)))) ** (k / (k - 1))) * p_total
+        t_exit = t_total * (2. / (k + 1.))
+        mach = 1.
+
+        choked = np.asarray(p_exit >= p_ambient)
+        if not choked.all():
+            policy = self.choke_policy
+            if policy == 'raise':
+                raise ValueError('Nozzle is not choked at {} of {} point(s) thus the mach number at the exit is not'
+                                 ' known, stopping calculation'.format(np.count_nonzero(~choked), choked.size))
+            elif policy == 'subsonic':
+                t_subsonic = t_total * (1 - eta * (1 - (p_ambient / p_total) ** ((k - 1) / k)))
+                with np.errstate(invalid='ignore'):
+                    mach_subsonic = np.sqrt((2. / (k - 1.)) * ((t_total / t_subsonic) - 1.))
+                mach_subsonic = where(p_total >= p_ambient, mach_subsonic, np.nan)
+                mach = where(choked, mach, mach_subsonic)
+                t_exit = where(choked, t_exit, t_subsonic)
+                p_exit = where(choked, p_exit, p_ambient)
+            elif policy == 'nan':
+                mach, t_exit, p_exit = [where(choked, value, np.nan) for value in (mach, t_exit, p_exit)]
+            else:
+                mach, t_exit, p_exit = [np.ma.masked_array(np.broadcast_arrays(value, choked)[0], mask=~choked)
+                                        for value in (mach, t_exit, p_exit)]
+
+        velocity = mach * np.sqrt(k * R * t_exit)
+        area = mass_flow / ((p_exit / (R * t_exit)) * velocity)
+        thrust = mass_flow * (velocity - v_0) + area * (p_exit - p_ambient)
+        t_ratio = 1 + (((k - 1) / 2.) * mach ** 2)
+        exit_flow = AttrDict(dict(t_total=t_exit * t_ratio,
+                                  p_total=p_exit * t_ratio ** (k / (k - 1)),
+                                  mass_flow=mass_flow,
+                                  t_static=t_exit,
+                                  p_static=p_exit,
+                                  mach=mach,
+                                  velocity=velocity,
+                                  area=area))
+        return AttrDict(dict(thrust=thrust, choked=choked, exit=exit_flow))
+
+
+def _evaluate(task):
+    """ Evaluates a single chunk of :py:meth:`CycleKernel.map`, defined at the top-level to be picklable
+
+    :param tuple task: Ideal cycle flag, choke policy and a dictionary of flat input chunks
+    :rtype: AttrDict
+    """
+    ideal_cycle, choke_policy, specs = task
+    return CycleKernel(ideal_cycle=ideal_cycle, choke_policy=choke_policy).evaluate(**specs)
+
+
+if __name__ == '__main__':
+    from engine import Engine
+    kernel = Engine(filename='GENX.cfg').compile()
+    out = kernel(pr_fan=np.linspace(1.4, 1.8, 5), bypass_ratio=np.linspace(8., 11., 4)[:, np.newaxis])
+    print(out.thrust)
+    print(out.sfc)
@@ -0,0 +1,187 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" Contains a batched Newton-Raphson solver that matches the components of an engine at off-design conditions """
+
+from __future__ import division
+from kernel import CycleKernel
+from utils import Attribute, AttrDict, Dual
+import numpy as np
+
+__author__ = 'San Kilkis'
+
+
+class OffDesign(object):
+
+    # Engine inputs that are no longer specified at off-design but follow from matching the components
+    __unknowns__ = ('corrected_mass_flow', 'bypass_ratio', 'pr_fan', 'pr_lpc', 'pr_hpc')
+
+    # Matching conditions that are held at their design values, one for each of the unknowns
+    __matching__ = ('hpt_capacity', 'lpt_capacity', 'core_area', 'bypass_area', 'lp_work_ratio')
+
+    def __init__(self, engine_in=None, tolerance=1e-10, max_iterations=50, max_step=0.2, steps=4):
+        """ Off-design performance of a sized engine. The design point of `engine_in` fixes the geometry, after which
+        the operating point for other ambient conditions and throttle settings, i.e. the `combustion_temperature`, is
+        found by matching the flow, work and speed of all components:
+
+            * Flow capacity of the HPT and LPT, m sqrt(T_t) / p_t, which are choked at their inlet guide vanes
+            * Exit area of the core and bypass :py:class:`Nozzle`, which is continuous across the choke boundary
+            * Enthalpy rise of the LPC relative to that of the fan, both run at the speed of the LP spool and the work
+              per stage scales w/ the square of the blade speed
+            * Work balance of both spools, which is satisfied by construction of :py:class:`CycleKernel`
+
+        The unknowns in :py:attr:`__unknowns__` are solved w/ Newton-Raphson iterations that are evaluated for all
+        operating points at once: the residuals of all points are one stacked call of the :py:class:`CycleKernel`
+        seeded w/ :py:class:`Dual` numbers, which directly yields the stacked (points, 5, 5) Jacobian that is solved
+        w/ :py:func:`numpy.linalg.solve`. Converged points are removed from subsequent iterations. The prescribed
+        conditions are approached from the design point in a number of continuation `steps`, each starting from the
+        solution of the previous one, since the design point itself can be an infeasible initial guess.
+
+        :param Engine engine_in: Engine at its design point, the component efficiencies are held constant
+        :param float tolerance: Convergence tolerance on the relative residuals
+        :param int max_iterations: Maximum number of Newton-Raphson iterations
+        :param float max_step: Maximum relative change of any unknown in a single iteration
+        :param int steps: Number of continuation steps from the design point to the prescribed conditions
+        """
+        self.engine_in = engine_in
+        self.tolerance = tolerance
+        self.max_iterations = int(max_iterations)
+        self.max_step = max_step
+        self.steps = int(steps)
+
+    @Attribute
+    def kernel(self):
+        """ Compiled engine, unchoked nozzles are always treated as subsonic to obtain continuous residuals
+
+        :rtype: CycleKernel
+        """
+        design = self.engine_in.compile()
+        return CycleKernel(ideal_cycle=design.ideal_cycle, defaults=design.defaults, choke_policy='subsonic')
+
+    @Attribute
+    def design_point(self):
+        """ Values of the unknowns and the matching conditions at the design point
+
+        :rtype: AttrDict
+        """
+        return AttrDict({'unknowns': {name: float(self.kernel.defaults[name]) for name in self.__unknowns__},
+                         'matching': dict(zip(self.__matching__, [float(getattr(value, 'value', value))
+                                                                  for value in self.matching(self.kernel())]))})
+
+    @staticmethod
+    def matching(out):
+        """ Evaluates the matching conditions from the outputs of the :py:class:`CycleKernel`
+
+        :param AttrDict out: Outputs of :py:meth:`CycleKernel.evaluate`
+        :rtype: list
+        """
+        s = out.stations
+        return [s['4'].mass_flow * np.sqrt(s['4'].t_total) / s['4'].p_total,
+                s['45'].mass_flow * np.sqrt(s['45'].t_total) / s['45'].p_total,
+                s['8'].area,
+                s['18'].area,
+                (s['25'].t_total - s['21'].t_total) / (s['21'].t_total - s['2'].t_total)]
+
+    def residuals(self, unknowns, conditions):
+        """ Relative deviation of the matching conditions from their design values
+
+        :param dict unknowns: Current values of the unknowns
+        :param dict conditions: Ambient conditions, throttle setting and any other fixed inputs
+        :rtype: list
+        """
+        out = self.kernel(**dict(conditions, **unknowns))
+        return [value / self.design_point.matching[name] - 1.
+                for name, value in zip(self.__matching__, self.matching(out))]
+
+    def newton(self, x, conditions, active):
+        """ Newton-Raphson iterations of all `active` points, the unknowns `x` are updated in place. Steps that lead
+        to an infeasible cycle, i.e. non-finite residuals, are repeatedly halved before a point is considered failed.
+
+        :param np.ndarray x: Unknowns w/ shape (points, 5)
+        :param dict conditions: Flat arrays of the prescribed conditions
+        :param np.ndarray active: Mask of the points that are solved
+        :return: Mask of the converged points and the number of iterations that evaluated the residuals
+        :rtype: tuple
+        """
+        converged, failed = np.zeros(active.shape, dtype=bool), ~active
+        previous, halvings = x.copy(), np.zeros(active.shape, dtype=int)
+        iterations = 0
+        for _ in range(self.max_iterations):
+            index = np.flatnonzero(~(converged | failed))
+            if index.size == 0:
+                break
+            iterations += 1
+
+            seeds = Dual.seed(**{name: x[index, j] for j, name in enumerate(self.__unknowns__)})
+            residuals = self.residuals(seeds, {key: value[index] for key, value in conditions.items()})
+            r = np.stack([np.broadcast_to(entry.value, index.shape) for entry in residuals], axis=-1)
+            jacobian = np.stack([np.stack([np.broadcast_to(entry.derivative(name), index.shape)
+                                           for name in self.__unknowns__], axis=-1) for entry in residuals], axis=-2)
+
+            # Retreating halfway towards the last feasible iterate if the step resulted in an infeasible cycle
+            norm = np.max(np.abs(r), axis=-1)
+            infeasible = ~np.isfinite(norm) | ~np.all(np.isfinite(jacobian), axis=(-2, -1))
+            retreat = index[infeasible & (halvings[index] < 10)]
+            x[retreat] = 0.5 * (x[retreat] + previous[retreat])
+            halvings[retreat] += 1
+            failed[index[infeasible & (halvings[index] >= 10)]] = True
+
+            converged[index[~infeasible & (norm < self.tolerance)]] = True
+            step_mask = ~infeasible & (norm >= self.tolerance)
+            if not step_mask.any():
+                continue
+
+            stepping = index[step_mask]
+            step = np.linalg.solve(jacobian[step_mask], -r[step_mask][..., np.newaxis])[..., 0]
+            relative = np.max(np.abs(step / x[stepping]), axis=-1)
+            scale = np.minimum(1., self.max_step / np.maximum(relative, 1e-300))
+            previous[stepping], halvings[stepping] = x[stepping], 0
+            x[stepping] += scale[:, np.newaxis] * step
+        return converged, iterations
+
+    def solve(self, **conditions):
+        """ Solves the operating points for the provided (arrays of) conditions, i.e.:
+
+        >>> deck = OffDesign(Engine(filename='GENX.cfg')).solve(combustion_temperature=np.linspace(1300., 1700., 50),
+        ...                                                     mach=0.)
+
+        :param conditions: Inputs of the :py:class:`CycleKernel` other than the unknowns, i.e. `mach`, `p_static`,
+                           `t_static` and `combustion_temperature`. Missing inputs remain at their design values
+        :return: Outputs of the :py:class:`CycleKernel` at the solution broadcast to the shape of the conditions, the
+                 solved 'unknowns', the 'converged' mask and the total number of 'iterations'
+        :rtype: AttrDict
+        """
+        invalid = [key for key in conditions if key in self.__unknowns__ or key not in self.kernel.__inputs__]
+        if invalid:
+            raise KeyError('The following conditions cannot be prescribed at off-design: {}'.format(', '.join(invalid)))
+
+        keys = list(conditions.keys())
+        values = np.broadcast_arrays(*[np.asarray(conditions[key], dtype=float) for key in keys]) if keys else []
+        shape = values[0].shape if keys else ()
+        conditions = {key: value.ravel() for key, value in zip(keys, values)}
+        n = int(np.prod(shape))
+
+        x = np.tile([self.design_point.unknowns[name] for name in self.__unknowns__], (n, 1))
+        converged, iterations = np.ones(n, dtype=bool), 0
+
+        # Continuation from the design point towards the prescribed conditions
+        for fraction in np.linspace(0., 1., self.steps + 1)[1:]:
+            stage = {key: self.kernel.defaults[key] + fraction * (value - self.kernel.defaults[key])
+                     for key, value in conditions.items()}
+            converged, count = self.newton(x, stage, converged)
+            iterations += count
+
+        unknowns = {name: x[:, j] for j, name in enumerate(self.__unknowns__)}
+        out = self.kernel(**dict(conditions, **unknowns))
+        out.update(unknowns=unknowns, converged=converged)
+        out = CycleKernel.merge([out], [n], shape)
+        out.iterations = iterations
+        return out
+
+
+if __name__ == '__main__':
+    from engine import Engine
+    deck = OffDesign(Engine(filename='GENX.cfg')).solve(combustion_temperature=np.linspace(1300., 1700., 5))
+    print(deck.thrust)
+    print(deck.unknowns.pr_hpc)
+    print(deck.converged)
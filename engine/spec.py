@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" Contains an immutable value object of the complete specification of an engine """
+
+from specparser import SpecParser
+from kernel import CycleKernel
+from definitions import FlowCondition
+from components import ComponentMap
+from utils import Attribute, FrozenDict, ResultsStore
+import numpy as np
+
+__author__ = 'San Kilkis'
+
+
+class EngineSpec(FrozenDict):
+
+    # Specification entries, which are all fields of :py:class:`SpecParser` including the ambient state
+    __fields__ = CycleKernel.__inputs__ + ('nozzle_type', 'pr_ovr', 'component_maps')
+
+    # Pressure ratios of which :py:attr:`pr_ovr` is the product, unless it is specified explicitly
+    __pressure_ratios__ = ('pr_fan', 'pr_lpc', 'pr_hpc')
+
+    # Options of the :py:class:`Engine` that are part of the specification
+    __options__ = ('filename', 'ideal_cycle', 'choke_policy')
+
+    # Fields that define the ambient flow condition rather than an attribute of the engine
+    __ambient__ = ('mach', 'p_static', 't_static')
+
+    def __init__(self, *args, **kwargs):
+        """ Frozen specification of an engine w/ one entry per field in :py:attr:`__fields__` and
+        :py:attr:`__options__`, which are accessible both as items and as attributes (i.e. ``spec.pr_fan``). Array
+        entries (i.e. a design range) are stored read-only, thus a specification can be shared between engines,
+        cached and pickled to worker processes w/o copying. Variants are obtained w/ :py:meth:`replace`, which only
+        copies the references of the unchanged entries:
+
+        >>> spec = EngineSpec.from_file('GENX.cfg')
+        >>> engine = Engine(spec=spec.replace(pr_fan=1.7, mach=0.))
+
+        Specifications are hashable and compare equal if all entries are equal, where arrays are compared by value.
+        Numeric fields are converted w/ :py:meth:`SpecReader.convert`, thus ``mach=0`` and ``mach=0.`` are equal. The
+        `component_maps` are stored as the filename and interpolation method of each map, see :py:meth:`maps`. The
+        `filename` of an engine that was specified in memory w/o a file is ``None``.
+        """
+        entries = dict(*args, **kwargs)
+        unknown = [key for key in entries if key not in self.__fields__ + self.__options__]
+        if unknown:
+            raise KeyError('The following entries are not part of an engine specification: {}'
+                           .format(', '.join(unknown)))
+        missing = [key for key in self.__fields__ + self.__options__ if key not in entries]
+        if missing:
+            raise KeyError('The following entries of the engine specification were not provided: {}'
+                           .format(', '.join(missing)))
+        for key in self.__fields__:
+            entries[key] = self.normalize(key, entries[key])
+        super(EngineSpec, self).__init__(entries)
+
+    def __getattr__(self, key):
+        try:
+            return self[key]
+        except KeyError:
+            raise AttributeError("'{}' object has no attribute '{}'".format(self.__class__.__name__, key))
+
+    def __hash__(self):
+        return hash(self.digest)
+
+    def __eq__(self, other):
+        return isinstance(other, EngineSpec) and self.digest == other.digest
+
+    def __ne__(self, other):
+        return not self == other
+
+    @staticmethod
+    def normalize(key, value):
+        """ Converts the entry `key` into its canonical, immutable form
+
+        :param str key: Name of the field
+        :param value: Value of the field, i.e. a number, (read-only) array or dictionary of component maps
+        """
+        if key == 'component_maps':
+            return FrozenDict((name, FrozenDict(entry) if isinstance(entry, dict) else
+                               FrozenDict(filename=entry.filename, method=entry.method))
+                              for name, entry in (value or {}).items())
+        value = SpecParser.convert(value)
+        if isinstance(value, np.ndarray):
+            if value.dtype.kind in 'biu':
+                value = value.astype(float)
+            elif value.flags.writeable:
+                value = value.copy()
+            value.flags.writeable = False
+        return value
+
+    @classmethod
+    def from_file(cls, filename='GE90.cfg', ideal_cycle=False, choke_policy='subsonic'):
+        """ Specification of the engine .cfg file `filename`, which is parsed at most once per process
+
+        :param str filename: Filename w/ extension of desired engine
+        :param bool ideal_cycle: Toggles if the compression and expansion processes are isentropic
+        :param str choke_policy: Treatment of unchoked nozzle points, see :py:meth:`Nozzle.select`
+        :rtype: EngineSpec
+        """
+        parser = SpecParser(filename)
+        return cls({key: parser.reader[key] if key in cls.__ambient__ else getattr(parser, key)
+                    for key in cls.__fields__}, filename=filename, ideal_cycle=ideal_cycle, choke_policy=choke_policy)
+
+    @Attribute
+    def digest(self):
+        """ SHA-1 hash of all entries, see :py:meth:`ResultsStore.digest`
+
+        :rtype: str
+        """
+        return ResultsStore.digest(self)
+
+    @property
+    def ambient(self):
+        """ Ambient flow condition of the specification
+
+        :rtype: FlowCondition
+        """
+        return FlowCondition(corrected_mass_flow=self.corrected_mass_flow,
+                             medium='air',
+                             station_number='0',
+                             **{key: self[key] for key in self.__ambient__})
+
+    def maps(self):
+        """ Performance maps of the specification, see :py:attr:`SpecParser.component_maps`
+
+        :rtype: dict[str, ComponentMap]
+        """
+        return {name: ComponentMap(entry['filename'], method=entry['method'])
+                for name, entry in self['component_maps'].items()}
+
+    def replace(self, **overrides):
+        """ Copy of the specification w/ the provided entries replaced. If any of the pressure ratios is replaced but
+        :py:attr:`pr_ovr` is not, the latter becomes their product.
+
+        :rtype: EngineSpec
+        """
+        if 'pr_ovr' not in overrides and any(key in overrides for key in self.__pressure_ratios__):
+            ratios = [overrides.get(key, self[key]) for key in self.__pressure_ratios__]
+            overrides['pr_ovr'] = ratios[0] * ratios[1] * ratios[2]
+        return self.__class__(self, **overrides)
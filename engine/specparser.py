@@ -6,6 +6,9 @@
 from constants import *
 from directories import DIRS
 from definitions import FlowCondition
+from components import ComponentMap
+from utils import FrozenDict
+import numpy as np
 import os
 try:
     import ConfigParser as config
@@ -21,40 +24,152 @@ class SpecReader(object):
 
     __default_directory__ = DIRS['ENGINE_DIR']
 
-    def __init__(self, filename='GE90.cfg'):
+    # Parsed specifications shared by all readers in the current process, keyed by the absolute path of the file
+    # together w/ its modification time and size such that an edited file is parsed again
+    __parsed__ = {}
+
+    # Entries that have to be present in a specification, whether it is read from a file or provided in memory
+    __required__ = ()
+
+    # Name of a specification that is provided in memory w/o a filename
+    __default_name__ = 'custom'
+
+    def __init__(self, filename='GE90.cfg', entries=None):
         """
-        :param str filename: Filename w/ extension of desired engine
+        :param str filename: Filename w/ extension of desired engine, can be ``None`` if `entries` are provided
+        :param entries: (Optional) Specification in memory instead of the file, either a mapping or a NumPy structured
+                        record (or array, whose fields then become arrays), see :py:meth:`load`
+        :type entries: collections.Mapping or np.void or np.ndarray
         """
+        if filename is None and entries is None:
+            raise ValueError('Either a filename or the entries of a specification must be provided')
         self.filename = filename
-        self.__name__ = filename.split('.')[0]
+        self.entries = entries
+        self.__name__ = filename.split('.')[0] if filename is not None else self.__default_name__
 
     def __repr__(self):
         return "<'{}' {} object at {}>".format(self.__name__,
                                                self.__class__.__name__,
                                                hex(id(self)))
 
+    @classmethod
+    def parse(cls, path):
+        """ Parses the .cfg file at `path` into a flat dictionary of all entries, values that represent a number are
+        converted to float. The result is cached for the current process, hence repeated calls for an unchanged file
+        only cost a single `os.stat`.
+
+        :param str path: Absolute path of the .cfg file
+        :rtype: FrozenDict
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            raise IOError('Engine specification {} does not exist'.format(path))
+        key = (path, stat.st_mtime, stat.st_size)
+        try:
+            return cls.__parsed__[key]
+        except KeyError:
+            cfg = config.SafeConfigParser()
+            cfg.read(path)
+            entries = []
+            for section in cfg.sections():
+                entries += cfg.items(section)
+            for stale in [entry for entry in cls.__parsed__ if entry[0] == path]:
+                del cls.__parsed__[stale]
+            return cls.__parsed__.setdefault(key, cls.validate(entries, path))
+
+    @classmethod
+    def load(cls, entries):
+        """ Converts a specification in memory into the same dictionary as :py:meth:`parse` w/o any file I/O. The
+        entries are either a mapping or a NumPy structured record of name, value pairs. Names are case-insensitive
+        as in a .cfg file and values are converted w/ :py:meth:`convert`, thus ``'0.8'``, ``np.float64(0.8)`` and
+        ``0.8`` are equivalent. A structured array of several records yields an array per numeric field, hence a batch
+        of engines, while text fields (i.e. `nozzle_type`) must be equal for all records.
+
+        :param entries: Specification, i.e. ``{'mach': 0.8, 'p_static': 22632., ...}``
+        :type entries: collections.Mapping or np.void or np.ndarray
+        :rtype: FrozenDict
+        """
+        names = getattr(getattr(entries, 'dtype', None), 'names', None)
+        if names is not None:
+            entries = [(name, cls.collapse(name, entries[name])) for name in names]
+        elif hasattr(entries, 'items'):
+            entries = entries.items()
+        else:
+            raise TypeError('Specification entries must be a mapping or a structured record, got {}'
+                            .format(type(entries).__name__))
+        return cls.validate(entries, 'in memory')
+
+    @staticmethod
+    def collapse(name, value):
+        """ Reduces the text field `name` of a structured array to its single value """
+        if np.ndim(value) == 0 or value.dtype.kind not in 'SUO':
+            return value
+        unique = set(value.ravel().tolist())
+        if len(unique) != 1:
+            raise ValueError("Field '{}' must have the same value for all records, got: {}".format(
+                name, ', '.join(sorted(str(entry) for entry in unique))))
+        return unique.pop()
+
+    @classmethod
+    def validate(cls, entries, source):
+        """ Converts the name, value pairs `entries` into an immutable dictionary and ensures that all entries in
+        :py:attr:`__required__` are present
+
+        :param collections.Iterable[tuple] entries: Name, value pairs of the specification
+        :param str source: Origin of the entries for error messages, i.e. the path of the file
+        :rtype: FrozenDict
+        """
+        entries = FrozenDict((str(name).lower(), cls.convert(value)) for name, value in entries)
+        missing = [key for key in cls.__required__ if key not in entries]
+        if missing:
+            raise KeyError('The following entries are missing from specification {}: {}'.format(source,
+                                                                                            ', '.join(missing)))
+        return entries
+
+    @staticmethod
+    def convert(value):
+        """ Converts `value` to float if it represents a number, non-scalar values (i.e. arrays) are kept """
+        if isinstance(value, bytes) and not isinstance(value, str):  # Strings of a structured record in Python 3
+            value = value.decode('utf-8')
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return value
+
     @Attribute  # Lazy-evaluation of reading procedure
     def reader(self):
-        """ Responsible for parsing the .cfg file into a list of key, value pairs
+        """ Responsible for parsing the .cfg file into an immutable dictionary of key, value pairs, which is shared by
+        all readers of the same file, or for converting the :py:attr:`entries` if these are provided in memory
 
-        :rtype: collections.Sequence[tuple]
+        :rtype: FrozenDict
         """
-        cfg = config.SafeConfigParser()
-        cfg.read(os.path.abspath(os.path.join(self.__default_directory__, self.filename)))
-        entries = []
-        for section in cfg.sections():
-            entries += cfg.items(section)
-        return dict(entries)
+        if self.entries is not None:
+            return self.load(self.entries)
+        return self.parse(os.path.abspath(os.path.join(self.__default_directory__, self.filename)))
 
 
 class SpecParser(SpecReader):
 
+    __required__ = ('mach', 'p_static', 't_static', 'corrected_mass_flow', 'nozzle_type', 'bypass_ratio',
+                    'combustion_temperature', 'pr_cc', 'pr_fan', 'pr_lpc', 'pr_hpc', 'eta_fan', 'eta_lpc', 'eta_hpc',
+                    'eta_lpt', 'eta_hpt', 'eta_mech', 'eta_cc', 'eta_nozzle', 'eta_inlet')
+
+    @classmethod
+    def get_spec_keys(cls):
+        """ Provides a list of all specification keys that are defined as an :py:class:`Attribute` of
+        :py:class:`SpecParser`, these represent the inputs of an engine
+
+        :rtype: list[str]
+        """
+        return [key for key, value in vars(SpecParser).items() if isinstance(value, Attribute)]
+
     @Attribute
     def ambient(self):
         """ Creates an ambient flow condition from specifications in the engine.cfg file """
-        return FlowCondition(mach=float(self.reader['mach']),
-                             p_static=float(self.reader['p_static']),
-                             t_static=float(self.reader['t_static']),
+        return FlowCondition(mach=self.reader['mach'],
+                             p_static=self.reader['p_static'],
+                             t_static=self.reader['t_static'],
                              corrected_mass_flow=self.corrected_mass_flow,
                              medium='air',
                              station_number='0')
@@ -62,7 +177,7 @@ class SpecParser(SpecReader):
     @Attribute
     def corrected_mass_flow(self):
         """ Correct mass flow in SI kilogram per second  """
-        return float(self.reader['corrected_mass_flow'])
+        return self.reader['corrected_mass_flow']
 
     @Attribute
     def nozzle_type(self):
@@ -72,82 +187,102 @@ class SpecParser(SpecReader):
     @Attribute
     def bypass_ratio(self):
         """ Ratio of cold-nozzle mass flow to core mass flow """
-        return float(self.reader['bypass_ratio'])
+        return self.reader['bypass_ratio']
 
     @Attribute
     def combustion_temperature(self):
         """ Temperature of outflow from the combustion chamber in SI Kelvin [k] """
-        return float(self.reader['combustion_temperature'])
+        return self.reader['combustion_temperature']
 
     @Attribute
     def pr_cc(self):
         """ Pressure Ratio across the Combustion Chamber """
-        return float(self.reader['pr_cc'])
+        return self.reader['pr_cc']
 
     @Attribute
     def pr_fan(self):
         """ Pressure Ratio across the Fan"""
-        return float(self.reader['pr_fan'])
+        return self.reader['pr_fan']
 
     @Attribute
     def pr_lpc(self):
         """ Pressure Ratio across the Low-Pressure Compressor """
-        return float(self.reader['pr_lpc'])
+        return self.reader['pr_lpc']
 
     @Attribute
     def pr_hpc(self):
         """ Pressure Ratio across the High-Pressure Compressor """
-        return float(self.reader['pr_hpc'])
+        return self.reader['pr_hpc']
 
     @Attribute
     def pr_ovr(self):
         """ Overall Pressure Ratio (Fan + All Compressors) """
-        return float(self.reader['pr_ovr']) or self.pr_fan * self.pr_lpc * self.pr_hpc
+        return self.reader.get('pr_ovr') or self.pr_fan * self.pr_lpc * self.pr_hpc
 
     @Attribute
     def eta_fan(self):
         """ Fan Isentropic Efficiency """
-        return float(self.reader['eta_fan'])
+        return self.reader['eta_fan']
 
     @Attribute
     def eta_lpc(self):
         """ Low-Pressure Compressor Efficiency """
-        return float(self.reader['eta_lpc'])
+        return self.reader['eta_lpc']
 
     @Attribute
     def eta_hpc(self):
         """ High-Pressure Compressor Efficiency """
-        return float(self.reader['eta_hpc'])
+        return self.reader['eta_hpc']
 
     @Attribute
     def eta_lpt(self):
         """ Low-Pressure Turbine Efficiency """
-        return float(self.reader['eta_lpt'])
+        return self.reader['eta_lpt']
 
     @Attribute
     def eta_hpt(self):
         """ High-Pressure Turbine Efficiency """
-        return float(self.reader['eta_hpt'])
+        return self.reader['eta_hpt']
 
     @Attribute
     def eta_mech(self):
         """ Mechanical Efficiency """
-        return float(self.reader['eta_mech'])
+        return self.reader['eta_mech']
 
     @Attribute
     def eta_cc(self):
         """ Combustion Efficiency """
-        return float(self.reader['eta_cc'])
+        return self.reader['eta_cc']
 
     @Attribute
     def eta_nozzle(self):
         """ (Exit) Nozzle Isentropic Efficiency """
-        return float(self.reader['eta_nozzle'])
+        return self.reader['eta_nozzle']
 
     @Attribute
     def eta_inlet(self):
         """ Inlet Isentropic Efficiency """
-        return float(self.reader['eta_inlet'])
+        return self.reader['eta_inlet']
+
+    @Attribute
+    def component_maps(self):
+        """ Performance maps of the turbomachinery from the optional `[component_maps]` section, which lists the map
+        file of each component as `<component>_map` (i.e. `fan_map`, `lpc_map`, `hpc_map`, `hpt_map` and `lpt_map`)
+        relative to the engine directory, as well as the `map_interpolation` method:
+
+        .. code-block:: ini
+
+            [component_maps]
+            fan_map = maps/fan.npy
+            hpc_map = maps/hpc.npy
+            map_interpolation = bicubic
+
+        :return: Dictionary of component names w/ their :py:class:`ComponentMap`, empty if no maps are specified
+        :rtype: dict[str, ComponentMap]
+        """
+        method = self.reader.get('map_interpolation', 'bilinear')
+        return {key[:-len('_map')]: ComponentMap(os.path.join(self.__default_directory__, value), method=method)
+                for key, value in self.reader.items() if key.endswith('_map')}
 
 
 if __name__ == '__main__':
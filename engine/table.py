@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" Contains the bulk ingestion of engine variants from a single columnar specification table """
+
+from __future__ import division
+from engine import Engine
+from kernel import CycleKernel
+from definitions import FlowCondition
+from utils import Attribute, SyncWriter, write_columns
+from directories import DIRS
+import numpy as np
+import os
+
+__author__ = 'San Kilkis'
+
+
+class EngineTable(object):
+
+    # Columns that define the ambient flow condition of each variant rather than an attribute of the engine
+    __ambient__ = ('mach', 'p_static', 't_static')
+
+    # Outputs of the :py:class:`CycleKernel` that are written to the results table
+    outputs = ('thrust', 'sfc', 'fuel_flow')
+
+    def __init__(self, filename, base='GE90.cfg', ideal_cycle=False, choke_policy='subsonic'):
+        """ Reads a table of engine variants w/ one row per variant and one column per input of the
+        :py:class:`CycleKernel` (i.e. `pr_fan`, `bypass_ratio`, `eta_hpt`, `mach` or `t_static`) into a single batched
+        :py:class:`Engine` whose attributes are arrays over the rows. Inputs that are not present as a column are
+        taken from the `base` specification, thus a table only has to contain the inputs that vary.
+
+        The table is either a comma-separated ``.csv`` file w/ a header row of the column names, which is parsed in
+        one pass w/ :py:func:`numpy.genfromtxt`, or a NumPy ``.npz`` archive w/ one 1-D array per column. Relative
+        paths are taken relative to the engine directory.
+
+        :param str filename: Filename w/ extension of the table, either ``.csv`` or ``.npz``
+        :param str base: Filename w/ extension of the engine specification that provides the remaining inputs
+        :param bool ideal_cycle: Toggles if the compression and expansion processes are isentropic
+        :param str choke_policy: Treatment of unchoked nozzle points, see :py:meth:`Nozzle.select`
+        """
+        self.filename = os.path.join(DIRS['ENGINE_DIR'], filename)
+        self.__name__ = os.path.splitext(os.path.basename(filename))[0]
+        self.base = base
+        self.ideal_cycle = ideal_cycle
+        self.choke_policy = choke_policy
+
+    def __repr__(self):
+        return "<'{}' {} w/ {} variant(s) at {}>".format(self.__name__, self.__class__.__name__, len(self),
+                                                       hex(id(self)))
+
+    def __len__(self):
+        return self.columns.values()[0].size if self.columns else 0
+
+    @staticmethod
+    def read(filename):
+        """ Parses a ``.csv`` or ``.npz`` table into a dictionary of float columns
+
+        :param str filename: Path of the table
+        :rtype: dict[str, np.ndarray]
+        """
+        if not os.path.isfile(filename):
+            raise IOError('Engine table {} does not exist'.format(filename))
+        if filename.endswith('.npz'):
+            with np.load(filename) as archive:
+                return {key: np.asarray(archive[key], dtype=float).ravel() for key in archive.files}
+        table = np.atleast_1d(np.genfromtxt(filename, delimiter=',', names=True, dtype=float, autostrip=True))
+        return {key: np.ascontiguousarray(table[key]) for key in table.dtype.names}
+
+    @Attribute
+    def columns(self):
+        """ Columns of the table, which are validated to be inputs of the :py:class:`CycleKernel` of equal length
+
+        :rtype: dict[str, np.ndarray]
+        """
+        columns = self.read(self.filename)
+        unknown = [key for key in columns if key not in CycleKernel.__inputs__]
+        if unknown:
+            raise KeyError('The following columns are not inputs of an engine: {}'.format(', '.join(unknown)))
+        if len(set(value.size for value in columns.values())) > 1:
+            raise ValueError('All columns of engine table {} must have the same length'.format(self.filename))
+        return columns
+
+    @Attribute
+    def engine(self):
+        """ Batched engine w/ the columns of the table as array attributes
+
+        :rtype: Engine
+        """
+        engine = Engine(filename=self.base, ideal_cycle=self.ideal_cycle, choke_policy=self.choke_policy)
+        for key, value in self.columns.items():
+            if key not in self.__ambient__:
+                setattr(engine, key, value)
+        engine.ambient = FlowCondition(corrected_mass_flow=engine.corrected_mass_flow,
+                                       medium='air',
+                                       station_number='0',
+                                       **{key: self.columns.get(key, getattr(engine.ambient, key))
+                                          for key in self.__ambient__})
+        if self.ideal_cycle:  # Efficiencies of the table are overruled by the ideal cycle
+            engine.make_ideal()
+        return engine
+
+    @Attribute
+    def results(self):
+        """ Outputs of all variants evaluated w/ a single call of the compiled :py:class:`CycleKernel`, each
+        quantity is broadcast to the number of rows of the table
+
+        :rtype: AttrDict
+        """
+        kernel = self.engine.compile()
+        return kernel.merge([kernel()], [len(self)], (len(self), ))
+
+    def write_csv(self, writer=None):
+        """ Writes the columns of the table followed by the thrust, sfc and fuel flow of each variant as a single
+        results table to the CSV directory
+
+        :param AsyncWriter writer: (Optional) Writer that serializes the file, i.e. an :py:class:`AsyncWriter` to
+                                   write in the background, defaults to a synchronous :py:class:`SyncWriter`
+        """
+        keys = sorted(self.columns.keys())
+        data = np.column_stack([self.columns[key] for key in keys] + [self.results[key] for key in self.outputs])
+        (writer or SyncWriter()).submit(write_columns, os.path.join(
+            DIRS['CSV_DIR'], '{}_variants.csv'.format(self.__name__)), keys + list(self.outputs), data)
+
+
+if __name__ == '__main__':
+    import tempfile
+    n = 1000
+    path = os.path.join(tempfile.gettempdir(), 'variants.npz')
+    np.savez(path, pr_fan=np.linspace(1.4, 1.8, n), bypass_ratio=np.linspace(8., 11., n), mach=np.full(n, 0.8))
+    obj = EngineTable(path, base='GENX.cfg')
+    print(obj)
+    print(obj.results.thrust)
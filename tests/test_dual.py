@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" Regression checks of the derivatives of an engine that is seeded w/ :py:class:`Dual` numbers """
+
+from engine import Engine, CycleKernel
+from utils import Dual
+import utils.dual
+import numpy as np
+import unittest
+
+__author__ = 'San Kilkis'
+
+
+class TestDifferentiate(unittest.TestCase):
+
+    # Relative step of the central finite differences
+    step = 1e-6
+
+    def assertGradient(self, engine):
+        """ Compares the exact gradient of the thrust against central finite differences of the compiled kernel """
+        kernel = engine.compile()
+        gradient = engine.differentiate().thrust.gradient
+        self.assertEqual(sorted(gradient.keys()), sorted(CycleKernel.__inputs__))
+        for key in CycleKernel.__inputs__:
+            value = kernel.defaults[key]
+            h = self.step * max(abs(value), 1.)
+            estimate = (kernel(**{key: value + h}).thrust - kernel(**{key: value - h}).thrust) / (2. * h)
+            np.testing.assert_allclose(gradient[key], estimate, rtol=1e-5, atol=1e-6 * abs(kernel().thrust),
+                                       err_msg=key)
+
+    def test_module(self):
+        """ :py:func:`utils.dual.where` only recognizes seeds that are instances of the very same class """
+        self.assertIs(Dual, utils.dual.Dual)
+
+    def test_choked(self):
+        engine = Engine(filename='GENX.cfg')
+        self.assertTrue(engine.nozzle_core.choked and engine.nozzle_bypass.choked)
+        self.assertGradient(engine)
+
+    def test_subsonic(self):
+        """ Low fan pressure ratio w/ an unchoked bypass nozzle, which is evaluated through :py:func:`where` """
+        engine = Engine(filename='GENX.cfg')
+        engine.pr_fan = 1.2
+        self.assertFalse(engine.nozzle_bypass.choked, msg='The bypass nozzle must be unchoked')
+        self.assertGradient(engine)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" Regression checks of the invalidation of the memoized component graph of :py:class:`Engine` """
+
+from engine import Engine, CycleKernel
+import numpy as np
+import unittest
+
+__author__ = 'San Kilkis'
+
+
+class TestInvalidation(unittest.TestCase):
+
+    # Engine inputs that are reassigned, the ambient state variables enter through the ambient FlowCondition
+    inputs = [key for key in CycleKernel.__inputs__ if key not in ('mach', 'p_static', 't_static')]
+
+    @staticmethod
+    def build():
+        """ Engine w/ all stages of its component graph evaluated
+
+        :rtype: Engine
+        """
+        engine = Engine(filename='GENX.cfg')
+        for name in engine.get_components(output='key'):
+            getattr(engine, name)
+        return engine
+
+    @staticmethod
+    def state(stage):
+        """ Total conditions and mass flow at all stations of a stage, or the required work of a spool
+
+        :rtype: np.ndarray
+        """
+        if not stage.__stations__:
+            return np.atleast_1d(stage.work_required)
+        return np.array([[flow.t_total, flow.p_total, flow.mass_flow] for flow in stage.stations], dtype=float)
+
+    def test_dependents(self):
+        """ Reassigning an input clears all stages whose state changes and only those that read the input or a changed
+        stage, the engine then matches one that was built w/ the new value from the start """
+        reference = self.build()
+        names = reference.get_components(output='key')
+        for key in self.inputs:
+            value = getattr(reference, key) * (0.99 if key.startswith('eta') else 1.01)
+
+            engine = self.build()
+            setattr(engine, key, value)
+            cleared = set(names) - set(engine.__dict__['__cache__'])
+
+            fresh = Engine(filename='GENX.cfg')
+            setattr(fresh, key, value)
+            changed = set(name for name in names if not np.allclose(self.state(getattr(fresh, name)),
+                                                                    self.state(getattr(reference, name))))
+
+            self.assertTrue(changed, msg='Reassigning {} has no effect'.format(key))
+            self.assertTrue(changed <= cleared, msg='Stale stages after reassigning {}: {}'.format(
+                key, ', '.join(changed - cleared)))
+            dependencies = reference.__dict__['__dependencies__']
+            superfluous = [name for name in cleared - changed if not dependencies[name] & (changed | {key})]
+            self.assertFalse(superfluous, msg='Independent stages cleared by reassigning {}: {}'.format(
+                key, ', '.join(superfluous)))
+            self.assertAlmostEqual(engine.thrust, fresh.thrust, places=6)
+            self.assertAlmostEqual(engine.sfc, fresh.sfc, places=9)
+            self.assertAlmostEqual(engine.specs[key], value)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" Regression checks of the parity between the :py:class:`CycleKernel` and the component chain of an engine """
+
+from engine import Engine, EngineSpec
+import numpy as np
+import unittest
+import warnings
+
+__author__ = 'San Kilkis'
+
+
+class TestKernelParity(unittest.TestCase):
+
+    # Quantities of each station that are compared
+    quantities = ('t_total', 'p_total', 'mass_flow')
+
+    def assertParity(self, engine):
+        """ Compares the thrust, sfc and station totals of the compiled kernel against those of the component chain """
+        out = engine.compile()()
+        shape = np.shape(engine.thrust)
+        for key in ('thrust', 'sfc'):
+            np.testing.assert_allclose(np.broadcast_to(out[key], shape), getattr(engine, key), rtol=1e-10,
+                                       err_msg=key)
+        stations = engine.stations
+        self.assertEqual(sorted(out.stations.keys()), sorted(stations.keys()))
+        for number, flow in stations.items():
+            for key in self.quantities:
+                np.testing.assert_allclose(np.broadcast_to(out.stations[number][key], shape),
+                                           np.broadcast_to(getattr(flow, key), shape), rtol=1e-10,
+                                           err_msg='{} at station {}'.format(key, number))
+        for nozzle in ('core', 'bypass'):
+            np.testing.assert_array_equal(np.broadcast_to(out.choked[nozzle], shape),
+                                          np.broadcast_to(getattr(engine, 'nozzle_' + nozzle).choked, shape))
+
+    def test_design_point(self):
+        for filename in ('GENX.cfg', 'GE90.cfg'):
+            self.assertParity(Engine(filename=filename))
+        self.assertParity(Engine(filename='GE90.cfg', ideal_cycle=True))
+
+    def test_grid(self):
+        """ N-D design grid w/ an unchoked bypass nozzle at low fan pressure ratios """
+        engine = Engine(filename='GENX.cfg', design_variable=['pr_fan', 'bypass_ratio'],
+                        design_range=[np.linspace(1.1, 1.7, 4), np.linspace(6., 11., 3)])
+        self.assertFalse(np.all(engine.nozzle_bypass.choked), msg='The grid must contain an unchoked point')
+        self.assertParity(engine)
+
+    def test_reverse_flow(self):
+        """ Unchoked bypass nozzle w/ a total pressure below the ambient static pressure, which yields NaN w/o any
+        warnings of the invalid square root """
+        spec = EngineSpec.from_file('GENX.cfg').replace(mach=0., pr_fan=np.array([0.95, 1.3]))
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', RuntimeWarning)
+            engine = Engine(spec=spec)
+            reverse = engine.nozzle_bypass.p_total < engine.ambient.p_static
+            np.testing.assert_array_equal(reverse, [True, False])
+            np.testing.assert_array_equal(np.isnan(engine.thrust), reverse)
+            self.assertParity(engine)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" Regression checks of the matching of an engine at off-design conditions w/ :py:class:`OffDesign` """
+
+from engine import Engine, OffDesign
+import numpy as np
+import unittest
+
+__author__ = 'San Kilkis'
+
+
+class TestOffDesign(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = Engine(filename='GENX.cfg')
+        self.deck = OffDesign(self.engine)
+
+    def test_design_point(self):
+        """ W/o any conditions the solution is the design point, which converges in a single pass per step """
+        out = self.deck.solve()
+        self.assertTrue(np.all(out.converged))
+        self.assertEqual(out.iterations, self.deck.steps)
+        for name, value in self.deck.design_point.unknowns.items():
+            np.testing.assert_allclose(out.unknowns[name], value, rtol=1e-10, err_msg=name)
+        np.testing.assert_allclose(out.thrust, self.engine.thrust, rtol=1e-10)
+
+    def test_throttle(self):
+        """ Sweep of the combustion temperature, all points converge to residuals below the tolerance """
+        conditions = {'combustion_temperature': np.linspace(1300., 1700., 5)}
+        out = self.deck.solve(**conditions)
+        self.assertTrue(np.all(out.converged))
+        residuals = self.deck.residuals(out.unknowns, conditions)
+        self.assertLess(np.max(np.abs(residuals)), self.deck.tolerance)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,3 +2,12 @@ from print_progress import ProgressBar
 from attribute import Attribute
 from undefined import Undefined
 from attrdict import AttrDict
+from grid import design_grid
+from dual import Dual
+from parallel import ParallelExecutor
+from statistics import StreamingStatistics
+from frozendict import FrozenDict
+from export import write_columns
+from store import ResultsStore
+from writer import AsyncWriter, SyncWriter
+from memoize import DiskCache
@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" Contains a local model of the thermodynamic properties of dry air """
+
+from __future__ import division
+from constants import Constants, Attribute
+import numpy as np
+
+__author__ = 'San Kilkis'
+
+
+class DryAir(Constants):
+
+    # Reference state of the entropy scale: static temperature in SI Kelvin [K], static pressure in SI Pascal [Pa] and
+    # specific entropy in SI Joule per kilogram Kelvin [J/kg K]. This is the entry of `analysis/cache/entropy_table.dat`
+    # which was obtained from the dry air calculator of the IRC (http://www.irc.wisc.edu/properties/)
+    __reference__ = (228.81, 30148.23, 6940.)
+
+    def __init__(self, t_static=None, p_static=None, polynomial=None):
+        """ Specific entropy of dry air as an ideal gas for (N-D arrays of) static temperatures and pressures, i.e.:
+
+            s = s_ref + int(c_p(T) / T dT, T_ref, T) - R ln(p / p_ref)
+
+        By default the specific heat is constant and equal to :py:attr:`specific_heat_air`, which is consistent w/
+        the entropy changes of the stages in :py:class:`BraytonCycle`. Optionally a polynomial c_p(T) can be provided,
+        for which the integral is evaluated in closed form. The entropy scale is anchored to :py:attr:`__reference__`,
+        hence the tabulated value is reproduced exactly at the reference state w/o any network access.
+
+        :param t_static: Static Temperature in SI Kelvin [K], can be an (N-D) array
+        :param p_static: Static Pressure in SI Pascal [Pa], broadcast against `t_static`
+        :param collections.Sequence[float] polynomial: (Optional) Coefficients of c_p(T) in SI Joule per kilogram
+                                                       Kelvin [J/kg K] in increasing order of the power of T
+        """
+        self.t_static = np.asarray(t_static if t_static is not None else self.temperature_sl, dtype=float)
+        self.p_static = np.asarray(p_static if p_static is not None else self.pressure_sl, dtype=float)
+        self.polynomial = None if polynomial is None else np.asarray(polynomial, dtype=float)
+        if np.any(self.t_static <= 0.) or np.any(self.p_static <= 0.):
+            raise ValueError('The static temperature and pressure of dry air must be larger than zero')
+
+    def entropy_integral(self, t):
+        """ Anti-derivative of c_p(T) / T in SI Joule per kilogram Kelvin [J/kg K]
+
+        :param np.ndarray t: Temperature in SI Kelvin [K]
+        :rtype: np.ndarray
+        """
+        if self.polynomial is None:
+            return self.specific_heat_air * np.log(t)
+        integral = self.polynomial[0] * np.log(t)
+        for power, coefficient in enumerate(self.polynomial[1:], start=1):
+            integral = integral + coefficient * t ** power / power
+        return integral
+
+    @Attribute
+    def specific_heat(self):
+        """ Specific Heat at Constant Pressure c_p in SI Joule per kilogram Kelvin [J/kg K] """
+        if self.polynomial is None:
+            return np.full(self.t_static.shape, self.specific_heat_air)
+        return np.polynomial.polynomial.polyval(self.t_static, self.polynomial)
+
+    @Attribute
+    def specific_entropy(self):
+        """ Specific Entropy in SI Joule per kilogram Kelvin [J/kg K] """
+        t_ref, p_ref, s_ref = self.__reference__
+        return (s_ref + self.entropy_integral(self.t_static) - self.entropy_integral(t_ref) -
+                self.gas_constant * np.log(self.p_static / p_ref))
+
+
+if __name__ == '__main__':
+    obj = DryAir(t_static=np.linspace(220., 300., 5), p_static=30148.23)
+    print(obj.specific_entropy)
+    print(DryAir(*DryAir.__reference__[:2]).specific_entropy)
@@ -0,0 +1,228 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" Contains a dual-number array type for forward-mode automatic differentiation of the cycle calculations """
+
+from __future__ import division
+from attrdict import AttrDict
+import numpy as np
+import operator
+
+__author__ = 'San Kilkis'
+
+
+class Dual(object):
+    """ Forward-mode Automatic Differentiation Number
+
+    A :py:class:`Dual` carries a (N-D) value together w/ the exact derivatives of that value w.r.t. a set of seeded
+    independent variables :py:attr:`names`. The derivatives are stored w/ a trailing seed axis, thus they are
+    broadcastable to ``value.shape + (len(names),)``. Arithmetic operators as well as the :py:func:`numpy.sqrt`,
+    :py:func:`numpy.exp` and :py:func:`numpy.log` ufuncs propagate the derivatives through the chain rule, while
+    comparisons act on the value only. Use :py:func:`where` instead of :py:func:`numpy.where` to merge duals.
+
+    >>> seeds = Dual.seed(x=2., y=3.)
+    >>> (seeds['x'] * np.sqrt(seeds['y'])).gradient['y']
+    0.5773502691896258
+    """
+
+    __array_priority__ = 100.
+
+    # Ufuncs that map directly onto the arithmetic operators of :py:class:`Dual`
+    __operators__ = {np.add: operator.add,
+                     np.subtract: operator.sub,
+                     np.multiply: operator.mul,
+                     np.divide: operator.truediv,
+                     np.true_divide: operator.truediv,
+                     np.power: operator.pow}
+
+    # Ufuncs that only act on the value of a :py:class:`Dual`
+    __value_ufuncs__ = (np.greater, np.greater_equal, np.less, np.less_equal, np.equal, np.not_equal, np.isnan,
+                        np.isfinite, np.isinf, np.sign)
+
+    def __init__(self, value, derivatives, names):
+        """
+        :param value: Value of the dual number
+        :param derivatives: Derivatives of the value w/ a trailing axis corresponding to `names`
+        :param collections.Sequence[str] names: Names of the seeded independent variables
+        """
+        self.value = np.asarray(value, dtype=float)
+        self.derivatives = np.asarray(derivatives, dtype=float)
+        self.names = tuple(names)
+
+    def __repr__(self):
+        return 'Dual({}, names={})'.format(repr(self.value), self.names)
+
+    @classmethod
+    def seed(cls, **values):
+        """ Creates the independent variables of a differentiation, each w/ a unit derivative w.r.t. itself
+
+        :param values: Values of the independent variables, can be (N-D) arrays
+        :rtype: dict[str, Dual]
+        """
+        names = tuple(sorted(values.keys()))
+        seeds = {}
+        for i, name in enumerate(names):
+            value = np.asarray(values[name], dtype=float)
+            derivatives = np.zeros(value.shape + (len(names),))
+            derivatives[..., i] = 1.
+            seeds[name] = cls(value, derivatives, names)
+        return seeds
+
+    @classmethod
+    def constant(cls, value, names):
+        """ Wraps a constant in a :py:class:`Dual` w/ zero derivatives, existing duals are returned as is
+
+        :param value: Constant value or :py:class:`Dual`
+        :param collections.Sequence[str] names: Names of the seeded independent variables
+        :rtype: Dual
+        """
+        if isinstance(value, Dual):
+            if value.names != tuple(names):
+                raise ValueError('Dual numbers seeded w/ different independent variables cannot be combined')
+            return value
+        return cls(value, 0., names)
+
+    @property
+    def shape(self):
+        return self.value.shape
+
+    @property
+    def gradient(self):
+        """ Derivatives of the value w.r.t. each of the independent variables
+
+        :rtype: AttrDict
+        """
+        derivatives = np.broadcast_to(self.derivatives, self.value.shape + (len(self.names),))
+        return AttrDict({name: derivatives[..., i] for i, name in enumerate(self.names)})
+
+    def derivative(self, name):
+        """ Derivative of the value w.r.t. the independent variable `name`
+
+        :param str name: Name of a seeded independent variable
+        """
+        return self.gradient[name]
+
+    # Chain rule for the arithmetic operators, v is the value and d are the derivatives of the operands
+    def __add__(self, other):
+        other = self.constant(other, self.names)
+        return Dual(self.value + other.value, self.derivatives + other.derivatives, self.names)
+
+    def __radd__(self, other):
+        return self.__add__(other)
+
+    def __sub__(self, other):
+        other = self.constant(other, self.names)
+        return Dual(self.value - other.value, self.derivatives - other.derivatives, self.names)
+
+    def __rsub__(self, other):
+        return self.constant(other, self.names).__sub__(self)
+
+    def __mul__(self, other):
+        other = self.constant(other, self.names)
+        return Dual(self.value * other.value,
+                    self.derivatives * other.value[..., None] + self.value[..., None] * other.derivatives,
+                    self.names)
+
+    def __rmul__(self, other):
+        return self.__mul__(other)
+
+    def __truediv__(self, other):
+        other = self.constant(other, self.names)
+        value = self.value / other.value
+        return Dual(value,
+                    (self.derivatives - value[..., None] * other.derivatives) / other.value[..., None],
+                    self.names)
+
+    def __rtruediv__(self, other):
+        return self.constant(other, self.names).__truediv__(self)
+
+    __div__, __rdiv__ = __truediv__, __rtruediv__
+
+    def __pow__(self, other):
+        other = self.constant(other, self.names)
+        value = self.value ** other.value
+        derivatives = (other.value * self.value ** (other.value - 1.))[..., None] * self.derivatives
+        if np.any(other.derivatives != 0.):  # Only needed if the exponent depends on the independent variables
+            derivatives = derivatives + (value * np.log(self.value))[..., None] * other.derivatives
+        return Dual(value, derivatives, self.names)
+
+    def __rpow__(self, other):
+        return self.constant(other, self.names).__pow__(self)
+
+    def __neg__(self):
+        return Dual(-self.value, -self.derivatives, self.names)
+
+    def __pos__(self):
+        return self
+
+    def __abs__(self):
+        return Dual(np.abs(self.value), np.sign(self.value)[..., None] * self.derivatives, self.names)
+
+    # Comparisons only act on the value
+    def __gt__(self, other):
+        return self.value > getattr(other, 'value', other)
+
+    def __ge__(self, other):
+        return self.value >= getattr(other, 'value', other)
+
+    def __lt__(self, other):
+        return self.value < getattr(other, 'value', other)
+
+    def __le__(self, other):
+        return self.value <= getattr(other, 'value', other)
+
+    def __getitem__(self, item):
+        derivatives = np.broadcast_to(self.derivatives, self.value.shape + (len(self.names),))
+        return Dual(self.value[item], derivatives[item], self.names)
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        """ Dispatches the supported NumPy ufuncs, this is also reached if an array is the left-hand operand """
+        if method != '__call__' or kwargs:
+            return NotImplemented
+
+        if ufunc in self.__operators__:
+            a, b = [self.constant(entry, self.names) for entry in inputs]
+            return self.__operators__[ufunc](a, b)
+        elif ufunc in self.__value_ufuncs__:
+            return ufunc(*[getattr(entry, 'value', entry) for entry in inputs])
+        elif ufunc is np.negative:
+            return -inputs[0]
+        elif ufunc is np.absolute:
+            return abs(inputs[0])
+
+        x = inputs[0]
+        if ufunc is np.sqrt:
+            value = np.sqrt(x.value)
+            return Dual(value, (0.5 / value)[..., None] * x.derivatives, x.names)
+        elif ufunc is np.exp:
+            value = np.exp(x.value)
+            return Dual(value, value[..., None] * x.derivatives, x.names)
+        elif ufunc is np.log:
+            return Dual(np.log(x.value), x.derivatives / x.value[..., None], x.names)
+        else:
+            return NotImplemented
+
+
+def where(condition, x, y):
+    """ :py:class:`Dual` aware version of :py:func:`numpy.where`, plain arrays are passed on to NumPy directly
+
+    :param np.ndarray condition: Where ``True`` yield `x` otherwise `y`
+    :param x: Values where `condition` is ``True``
+    :param y: Values where `condition` is ``False``
+    """
+    if not isinstance(x, Dual) and not isinstance(y, Dual):
+        return np.where(condition, x, y)
+
+    names = x.names if isinstance(x, Dual) else y.names
+    x, y = Dual.constant(x, names), Dual.constant(y, names)
+    condition = np.asarray(condition)
+    return Dual(np.where(condition, x.value, y.value),
+                np.where(condition[..., None], x.derivatives, y.derivatives),
+                names)
+
+
+if __name__ == '__main__':
+    seeds = Dual.seed(x=np.linspace(1., 2., 3), y=3.)
+    obj = seeds['x'] ** 2 * np.sqrt(seeds['y'])
+    print(obj.gradient.x)
+    print(obj.gradient.y)
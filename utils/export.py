@@ -0,0 +1,28 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" Contains a helper to write columnar data to a .csv file in bulk """
+
+import numpy as np
+
+__author__ = 'San Kilkis'
+
+
+def write_columns(filename, names, data, fmt='%.12g', chunk_size=8192):
+    """ Writes a table w/ a header row of the column `names` followed by one row per entry of `data`. Rows are
+    formatted in blocks of `chunk_size` w/ a single string operation per block rather than one per row or value,
+    thus the memory is bounded by the block while large tables are written an order of magnitude faster.
+
+    :param str filename: Path of the .csv file
+    :param collections.Sequence[str] names: Names of the columns
+    :param np.ndarray data: Values w/ shape (rows, columns), masked entries are written as NaN
+    :param str fmt: Format of a single value, defaults to the precision of :py:func:`str` for floats
+    :param int chunk_size: Number of rows that are formatted at once
+    """
+    data = np.ma.filled(np.ma.asarray(data, dtype=float), np.nan).reshape(-1, len(names))
+    row = ', '.join([fmt] * len(names)) + '\n'
+    with open(filename, 'w') as csv:
+        csv.write(', '.join(names) + '\n')
+        for start in range(0, data.shape[0], int(chunk_size)):
+            block = data[start:start + int(chunk_size)]
+            csv.write((row * block.shape[0]) % tuple(block.ravel()))
@@ -0,0 +1,35 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" Contains an immutable dictionary that can be shared safely between objects """
+
+__author__ = 'San Kilkis'
+
+
+class FrozenDict(dict):
+    """ Immutable and hashable Dictionary
+
+    A dictionary that raises a TypeError on any attempt to modify it after construction, hence a single instance can
+    be handed out to many objects w/o the risk of one of them changing the contents for all others. Since the contents
+    are fixed it is hashable as long as its values are.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(FrozenDict, self).__init__(*args, **kwargs)
+        self.__hash = None
+
+    def __immutable(self, *args, **kwargs):
+        raise TypeError("'{}' object does not support item assignment".format(self.__class__.__name__))
+
+    __setitem__ = __delitem__ = clear = pop = popitem = setdefault = update = __immutable
+
+    def __hash__(self):
+        if self.__hash is None:
+            self.__hash = hash(frozenset(self.items()))
+        return self.__hash
+
+    def __reduce__(self):
+        return self.__class__, (dict(self), )
+
+    def __repr__(self):
+        return '{}({})'.format(self.__class__.__name__, super(FrozenDict, self).__repr__())
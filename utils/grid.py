@@ -0,0 +1,38 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" Contains a helper to combine the ranges of multiple design variables into a broadcastable N-D grid """
+
+import numpy as np
+
+__author__ = 'San Kilkis'
+
+
+def design_grid(ranges, full_factorial=True):
+    """ Combines the ranges of multiple design variables into a single N-D grid. In a full-factorial grid each range
+    spans its own axis, thus the grid has the shape ``(len(r_0), len(r_1), ..., len(r_n))``. Otherwise the ranges
+    are treated as a user-supplied grid and are broadcast against each other as is.
+
+    :param collections.Sequence[np.ndarray] ranges: Values of each design variable
+    :param bool full_factorial: Toggles between a full-factorial (``True``) or user-supplied (``False``) grid
+    :return: One array per design variable w/ the common shape of the grid
+    :rtype: tuple[np.ndarray]
+    """
+    ranges = [np.asarray(r, dtype=float) for r in ranges]
+    if full_factorial:
+        for r in ranges:
+            if r.ndim != 1:
+                raise ValueError('A full-factorial grid can only be created from 1D ranges,'
+                                 ' a {}D array was provided'.format(r.ndim))
+        return tuple(np.meshgrid(*ranges, indexing='ij'))
+    else:
+        try:
+            return tuple(np.broadcast_arrays(*ranges))
+        except ValueError:
+            raise ValueError('The provided design ranges w/ shapes {} cannot be broadcast into a common grid'
+                             .format(', '.join(str(r.shape) for r in ranges)))
+
+
+if __name__ == '__main__':
+    pr_fan, bypass_ratio = design_grid((np.linspace(1.4, 1.8, 5), np.linspace(8., 11., 4)))
+    print(pr_fan.shape)
@@ -1,88 +1,114 @@
-from constants import Constants
+from constants import Constants, Attribute
 import numpy as np
 
 
-# TODO finish implementing all regions of the atmosphere
 class ISA(Constants):
 
-    def __init__(self, altitude=0):
-        """ Calculates International Standard Atmosphere properties for the specified geo-potential altitude
+    # Geo-potential base altitude of each layer of the atmosphere in SI meter [m] and its temperature lapse rate in SI
+    # Kelvin per meter [K/m]: troposphere, tropopause, stratosphere (2x), stratopause, mesosphere (2x)
+    __layers__ = np.array([0., 11000., 20000., 32000., 47000., 51000., 71000.])
+    __lapse_rates__ = np.array([-6.5e-3, 0., 1e-3, 2.8e-3, 0., -2.8e-3, -2e-3])
 
-        :param float altitude: Geo-potential Altitude in SI meter [m]
+    # Upper limit of the model in geo-potential altitude in SI meter [m], which corresponds to 86 km geometric altitude
+    __ceiling__ = 84852.
+
+    # Radius of the Earth used to convert geometric to geo-potential altitude in SI meter [m]
+    __earth_radius__ = 6356766.
+
+    # Standard gravitational acceleration in SI meter per second squared [m/s^2] and specific gas constant of air in SI
+    # Joule per kilogram Kelvin [J/kg K] by which the ISA is defined, these reproduce the tabulated ISA pressures
+    __g0__ = 9.80665
+    __r_air__ = 287.05287
+
+    def __init__(self, altitude=0., delta_t=0., geometric=False):
+        """ Calculates International Standard Atmosphere properties for the specified altitude(s) up to 86 km. All
+        properties are evaluated at once for (N-D) arrays of altitudes, the layer of each point is found w/
+        :py:func:`numpy.searchsorted` over the layer table.
+
+        A temperature deviation `delta_t` from the standard day shifts the temperature at constant pressure, i.e. the
+        altitude is treated as a pressure altitude, thus the density and speed of sound follow from the shifted
+        temperature.
+
+        :param altitude: Geo-potential Altitude in SI meter [m], can be an (N-D) array
+        :param delta_t: ISA Temperature Deviation in SI Kelvin [K], broadcast against `altitude`
+        :param bool geometric: Toggles if `altitude` is a geometric rather than a geo-potential altitude
         """
-        if 0. <= altitude <= 84852. and isinstance(altitude, float):
-            self.altitude = altitude
-        else:
-            raise ValueError('Invalid altitude specified')
+        altitude = np.asarray(altitude, dtype=float)
+        if geometric:
+            altitude = self.__earth_radius__ * altitude / (self.__earth_radius__ + altitude)
+        if np.any(altitude < 0.) or np.any(altitude > self.__ceiling__ + 1.) or np.any(np.isnan(altitude)):
+            raise ValueError('Invalid altitude specified, the ISA is only defined between 0 and {} m geo-potential '
+                             'altitude'.format(self.__ceiling__))
+        self.altitude = np.minimum(altitude, self.__ceiling__)  # Removes round-off of the conversion of 86 km
+        self.delta_t = np.asarray(delta_t, dtype=float)
+
+    @Attribute
+    def layer_table(self):
+        """ Temperature in SI Kelvin [K] and pressure in SI Pascal [Pa] at the base of each layer
+
+        :rtype: tuple[np.ndarray]
+        """
+        g, R = self.__g0__, self.__r_air__
+        temperature, pressure = [self.temperature_sl], [self.pressure_sl]
+        for h_0, h_1, a in zip(self.__layers__[:-1], self.__layers__[1:], self.__lapse_rates__[:-1]):
+            t_0, p_0 = temperature[-1], pressure[-1]
+            t_1 = t_0 + a * (h_1 - h_0)
+            pressure.append(p_0 * np.exp(-g * (h_1 - h_0) / (R * t_0)) if a == 0 else
+                            p_0 * (t_1 / t_0) ** (-g / (a * R)))
+            temperature.append(t_1)
+        return np.array(temperature), np.array(pressure)
+
+    @Attribute
+    def layer(self):
+        """ Index of the layer in :py:attr:`__layers__` that contains each altitude
+
+        :rtype: np.ndarray
+        """
+        return np.clip(np.searchsorted(self.__layers__, self.altitude, side='right') - 1, 0, self.__layers__.size - 1)
+
+    @Attribute
+    def t_standard(self):
+        """ Standard day temperature in SI Kelvin [K] """
+        t_base = self.layer_table[0][self.layer]
+        return t_base + self.__lapse_rates__[self.layer] * (self.altitude - self.__layers__[self.layer])
+
+    @Attribute
+    def temperature(self):
+        """ Static temperature in SI Kelvin [K] """
+        return self.t_standard + self.delta_t
+
+    @Attribute
+    def pressure(self):
+        """ Static pressure in SI Pascal [Pa] """
+        g, R = self.__g0__, self.__r_air__
+        t_base, p_base = [entry[self.layer] for entry in self.layer_table]
+        a, dh = self.__lapse_rates__[self.layer], self.altitude - self.__layers__[self.layer]
+        isothermal = a == 0
+        gradient = p_base * (self.t_standard / t_base) ** (-g / (np.where(isothermal, 1., a) * R))
+        return np.where(isothermal, p_base * np.exp(-g * dh / (R * t_base)), gradient)
+
+    @Attribute
+    def density(self):
+        """ Density in SI kilogram per meter cubed [kg/m^3] """
+        return self.pressure / (self.__r_air__ * self.temperature)
+
+    @Attribute
+    def speed_of_sound(self):
+        """ Speed of sound in SI meter per second [m/s] """
+        return np.sqrt(self.kappa_air * self.__r_air__ * self.temperature)
 
     @property
     def calculator(self):
-        h, R, T0, P0, rho0 = self.altitude, self.gas_constant, self.temperature_sl, self.pressure_sl, self.rho_sl
-        if h == 0:
-            Talt, Palt, rhoalt = T0, P0, rho0
-        elif 0 < h < 11000.:
-            a = -6.5e-3
-            Talt = T0 + (a * h)
-            Palt = P0 * (Talt / T0) ^ (-(self.g / (a * R)))
-            rhoalt = rho0 * ((Talt / T0) ^ (-((self.g / (a * R)) + 1)))
-        elif 11000 <= h < 25000:
-            a = -6.5e-3
-            Talt = 216.66
-            Palt = P0*(Talt/T0)**(-(self.g/(a*R)))
-            rhoalt = 0.36480*(np.exp(-1 * ((self.g*(h-11000.))/(R * T0))))
-        else:
-            Talt = None
-            Palt = None
-            rhoalt = None
-        return Talt, Palt, rhoalt
-
-
-# function [T,Palt,rhoalt,a]=ISA(h)
-# global Econst
-# %Calculates the Temperature [K] using International Standard Atmosphere
-# if(h>=0)&&(h<=11000);
-#     T=Econst.Temp0+(Econst.lambda*h);
-#     Palt=Econst.P0*(T/Econst.Temp0)^(-(Econst.g/(Econst.lambda*Econst.R)));
-#     rhoalt=Econst.rho0*((T/Econst.Temp0)^(-((Econst.g/(Econst.lambda*Econst.R))+1)));
-# elseif(h>11000)&&(h<=25000);
-#     T=216.66;
-#     Palt=22700*((exp(1))^(-((Econst.g*(h-11000))/(Econst.R*T))));
-#     rhoalt=0.36480*((exp(1))^(-((Econst.g*(h-11000))/(Econst.R*T))));
-# elseif(h>25000)&&(h<=47000);
-#     T=216.66+(1*((h-20000)/1000));
-#     Palt=5474.9*((216.65+(.001*(h-20000)))/216.65)^(-(Econst.g/(.001*Econst.R)));
-#     rhoalt=0.088035*((216.65+(.001*(h-20000)))/216.65)^(-((Econst.g/(.001*Econst.R))-1));
-# elseif(h>32000)&&(h<=47000);
-#     T=228.65+(2.8*((h-32000)/1000));
-#     Palt=868.02*((228.65+(0.0028*(h-32000)))/228.65)^(-(Econst.g/(0.0028*Econst.R)));
-#     rhoalt=0.013225*((228.65+(0.0028*(h-32000)))/228.65)^(-((Econst.g/(0.0028*Econst.R))-1));
-# elseif(h>47000)&&(h<=53000);
-#     T=270.65;
-#     Palt=110.91*((exp(1))^(-((Econst.g*(h-47000))/(Econst.R*270.65))));
-#     rhoalt=0.001428*((exp(1))^(-((Econst.g*(h-47000))/(Econst.R*270.65))));
-# elseif(h>53000)&&(h<=79000);
-#     T=270.65+((-2.8)*((h-51000)/1000));
-#     Palt=66.939*((270.65+(-0.0028*(h-51000)))/270.65)^(-(Econst.g/(-0.0028*Econst.R)));
-#     rhoalt=0.000862*((270.65+(-0.0028*(h-51000)))/270.65)^(-((Econst.g/(-0.0028*Econst.R))-1));
-# elseif(h>79000)&&(h<=90000);
-#     T=214.65+((-2.0)*((h-71000)/1000));
-#     Palt=3.9564*((214.65+(-0.002*(h-71000)))/214.65)^(-(Econst.g/(-0.002*Econst.R)));
-#     rhoalt=0.000064*((214.65+(-0.002*(h-71000)))/214.65)^(-((Econst.g/(-0.002*Econst.R))-1));
-# end
-# if(h<0)||(h>84852);
-#     disp('International Standard Atmosphere Calculations cannot be used for values above 84,852m')
-# end
-# if(h>=0)&&(h<=84852);
-# a=sqrt(1.4*Econst.R*T);
-# %FL=ceil(((h*1250)/381)/100);
-# %disp(['Temperature at Flight Level ' num2str(FL) ' = ' num2str(T) 'K' ' = ' num2str(T-273.15) 'C'])
-# %disp(['Pressure at Flight Level ' num2str(FL) ' = ' num2str(Palt/1000) 'kPa'])
-# %disp(['Density at Flight Level ' num2str(FL) ' = ' num2str(rhoalt) ' [kg/m3]'])
-# %disp(['Speed of Sound at Flight Level ' num2str(FL) ' = ' num2str(a) ' [m/s]'])
-# end
-# end
+        """ Temperature, pressure and density at the specified altitude(s)
+
+        :rtype: tuple
+        """
+        return self.temperature, self.pressure, self.density
+
 
 if __name__ == '__main__':
-    obj = ISA(11000.)
+    obj = ISA(np.linspace(0., 84852., 8), delta_t=10.)
     print(obj.altitude)
     print(obj.temperature)
+    print(obj.pressure)
+    print(obj.density)
@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" Contains a content-addressed on-disk cache to memoize evaluations across processes and sessions """
+
+from store import ResultsStore
+from collections import OrderedDict
+import tempfile
+import os
+
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+__author__ = 'San Kilkis'
+
+
+class DiskCache(object):
+
+    # Extension of the files of the cache entries
+    __extension__ = '.pkl'
+
+    def __init__(self, directory, max_size=2 ** 30, memory_entries=256):
+        """ Persistent cache of results that are addressed by the SHA-1 hash of a canonical description of their
+        inputs, see :py:meth:`key`. Each entry is a pickled file named after its hash, which is written to a temporary
+        file first and then renamed, thus concurrent processes never read a partial entry.
+
+        The least recently used entries are evicted once the total size of the cache exceeds `max_size`, where the
+        modification time of an entry is refreshed on each hit to track its use. Recent entries are also retained in
+        memory, hence repeated lookups within a process do not touch the disk.
+
+        :param str directory: Path of the cache, which is created if it does not exist
+        :param int max_size: Maximum total size of the entries on disk in SI byte [B]
+        :param int memory_entries: Number of entries that are retained in memory
+        """
+        self.directory = os.path.abspath(directory)
+        self.max_size = int(max_size)
+        self.memory_entries = int(memory_entries)
+        self.memory = OrderedDict()
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+
+    def __repr__(self):
+        return "<'{}' {} w/ {} entries at {}>".format(os.path.basename(self.directory), self.__class__.__name__,
+                                                     len(self.entries()), hex(id(self)))
+
+    def __contains__(self, key):
+        return key in self.memory or os.path.isfile(self.path(key))
+
+    @staticmethod
+    def key(**description):
+        """ Canonical hash of the keyword arguments, which are scalars, strings, arrays or (nested) dictionaries
+        thereof, that is independent of their order
+
+        :rtype: str
+        """
+        return ResultsStore.digest(description)
+
+    def path(self, key):
+        return os.path.join(self.directory, key + self.__extension__)
+
+    def entries(self):
+        """ Paths of all entries on disk
+
+        :rtype: list[str]
+        """
+        return [os.path.join(self.directory, name) for name in os.listdir(self.directory)
+                if name.endswith(self.__extension__)]
+
+    def get(self, key, default=None):
+        """ Value of the entry `key` or `default` if it is not present """
+        path = self.path(key)
+        try:
+            value = self.memory[key] = self.memory.pop(key)  # Moves the entry to the end of the memory
+        except KeyError:
+            try:
+                with open(path, 'rb') as entry:
+                    value = pickle.load(entry)
+            except (IOError, OSError, EOFError, pickle.UnpicklingError):
+                return default
+            self.remember(key, value)
+        try:
+            os.utime(path, None)  # Marks the entry as recently used for the eviction of all processes
+        except OSError:  # Evicted by another process in the meantime
+            pass
+        return value
+
+    def put(self, key, value):
+        """ Stores `value` as the entry `key` and evicts the least recently used entries if the cache is full """
+        handle, temporary = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(handle, 'wb') as entry:
+                pickle.dump(value, entry, protocol=pickle.HIGHEST_PROTOCOL)
+            self.rename(temporary, self.path(key))
+        finally:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+        self.remember(key, value)
+        self.evict()
+
+    @staticmethod
+    def rename(source, destination):
+        """ Atomically replaces `destination` by `source`. On Windows an existing destination cannot be replaced by
+        :py:func:`os.rename` in Python 2, in that case the entry was written by another process and is kept. """
+        try:
+            getattr(os, 'replace', os.rename)(source, destination)
+        except OSError:
+            if not os.path.isfile(destination):
+                raise
+
+    def remember(self, key, value):
+        self.memory.pop(key, None)
+        if len(self.memory) >= self.memory_entries:
+            self.memory.popitem(last=False)
+        self.memory[key] = value
+
+    def evict(self):
+        """ Removes the least recently used entries until the total size is within :py:attr:`max_size` """
+        stats = []
+        for path in self.entries():
+            try:
+                stat = os.stat(path)
+            except OSError:  # Removed by another process in the meantime
+                continue
+            stats.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in stats)
+        for _, size, path in sorted(stats):
+            if total <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            self.memory.pop(os.path.basename(path)[:-len(self.__extension__)], None)
+            total -= size
+
+    def clear(self):
+        """ Removes all entries """
+        for path in self.entries():
+            os.remove(path)
+        self.memory.clear()
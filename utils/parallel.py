@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" Contains a process-pool executor to spread independent evaluations over all available cores """
+
+from print_progress import ProgressBar
+import multiprocessing
+
+__author__ = 'San Kilkis'
+
+
+class ParallelExecutor(object):
+
+    def __init__(self, processes=None, chunk_size=1, header=None):
+        """ Maps a function over a sequence of independent tasks using a pool of worker processes. Results are
+        always returned in the order of the tasks regardless of which worker finishes first, thus a parallel run
+        is reproducible and identical to a serial one. The progress of all workers is aggregated in a single
+        :py:class:`ProgressBar` in the parent process.
+
+        .. Note: The mapped function and the tasks are pickled to reach the workers, hence the function has to be
+                 defined at the top-level of a module.
+
+        :param int processes: (Optional) Number of worker processes, defaults to the number of CPU cores. A single
+                              process evaluates all tasks serially in the current process w/o creating a pool
+        :param int chunk_size: Number of tasks that are sent to a worker at once, larger chunks reduce the
+                               communication overhead of many small tasks
+        :param str header: (Optional) Header of the :py:class:`ProgressBar`, no progress is shown if not provided
+        """
+        self.processes = multiprocessing.cpu_count() if processes is None else int(processes)
+        self.chunk_size = int(chunk_size)
+        self.header = header
+
+        if self.processes < 1 or self.chunk_size < 1:
+            raise ValueError('The number of processes and the chunk size must be positive integers')
+
+    def __repr__(self):
+        return '<{} w/ {} process(es) at {}>'.format(self.__class__.__name__, self.processes, hex(id(self)))
+
+    def map(self, func, tasks):
+        """ Evaluates `func` for each entry of `tasks`
+
+        :param func: Top-level function accepting a single task
+        :param collections.Sequence tasks: Independent tasks
+        :return: Results of `func` in the order of `tasks`
+        :rtype: list
+        """
+        tasks = list(tasks)
+        prog = ProgressBar(self.header) if self.header is not None and len(tasks) > 0 else None
+
+        if self.processes == 1 or len(tasks) <= 1:
+            results = self.collect((func(task) for task in tasks), prog, len(tasks))
+        else:
+            pool = multiprocessing.Pool(processes=min(self.processes, len(tasks)))
+            try:
+                results = self.collect(pool.imap(func, tasks, chunksize=self.chunk_size), prog, len(tasks))
+                pool.close()
+            except BaseException:
+                pool.terminate()
+                raise
+            finally:
+                pool.join()
+        return results
+
+    @staticmethod
+    def collect(results, prog, total):
+        """ Gathers the ordered `results` while updating the progress bar `prog` after each completed task """
+        if prog is None:
+            return list(results)
+        collected = []
+        for i, result in enumerate(results):
+            collected.append(result)
+            prog.update_loop(i + 1, total)
+        return collected
+
+
+def split(size, processes, chunk_size=None):
+    """ Splits the flat index range [0, `size`) into contiguous slices, either of length `chunk_size` or evenly
+    over the number of `processes` if no chunk size is provided
+
+    :param int size: Number of points
+    :param int processes: Number of worker processes
+    :param int chunk_size: (Optional) Number of points per slice
+    :rtype: list[slice]
+    """
+    if chunk_size is None:
+        chunk_size = -(-size // max(processes, 1))  # Ceiling division
+    chunk_size = max(int(chunk_size), 1)
+    return [slice(start, min(start + chunk_size, size)) for start in range(0, size, chunk_size)]
+
+
+if __name__ == '__main__':
+    executor = ParallelExecutor(header='Sample Parallel Process')
+    print(executor.map(abs, range(-10, 10)))
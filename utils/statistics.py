@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" Contains streaming statistics to summarize large numbers of samples in a fixed amount of memory """
+
+from __future__ import division
+import numpy as np
+
+__author__ = 'San Kilkis'
+
+
+class StreamingStatistics(object):
+
+    def __init__(self, bins=4096):
+        """ Accumulates the mean, variance, extremes and an adaptive histogram of samples that are provided in chunks
+        through :py:meth:`update`. The mean and variance are merged per chunk w/ the pairwise update of Chan et al.,
+        thus they are exact up to round-off. Quantiles are interpolated from the histogram which has a fixed number of
+        equal-width `bins`. If a chunk falls outside of the current histogram range the bin width is doubled by merging
+        neighbouring bins until it fits, hence the memory is independent of the number of samples while the
+        resolution of the quantiles is the range of the samples divided by `bins`.
+
+        :param int bins: Number of histogram bins, must be even
+        """
+        if bins < 2 or bins % 2:
+            raise ValueError('The number of histogram bins must be an even number larger than zero')
+        self.count = 0
+        self.mean = np.nan
+        self.m2 = 0.  # Sum of squared deviations from the mean
+        self.min = np.inf
+        self.max = -np.inf
+        self.invalid = 0  # Number of NaN or masked samples which are excluded from the statistics
+        self.counts = np.zeros(int(bins), dtype=np.int64)
+        self.lower, self.width = None, None
+
+    def __repr__(self):
+        return '<{} of {} sample(s), mean={}, std={}>'.format(self.__class__.__name__, self.count, self.mean,
+                                                              self.std)
+
+    @property
+    def variance(self):
+        """ Unbiased sample variance """
+        return self.m2 / (self.count - 1) if self.count > 1 else np.nan
+
+    @property
+    def std(self):
+        """ Unbiased sample standard deviation """
+        return np.sqrt(self.variance)
+
+    @property
+    def upper(self):
+        return self.lower + self.width * self.counts.size
+
+    def update(self, samples):
+        """ Merges a chunk of samples into the statistics, NaN and masked entries are counted as :py:attr:`invalid`
+
+        :param np.ndarray samples: Chunk of samples of any shape
+        :return: The current instance to allow chaining
+        :rtype: StreamingStatistics
+        """
+        flat = np.ma.masked_invalid(np.ma.ravel(samples))
+        valid = flat.compressed().astype(float)
+        self.invalid += flat.size - valid.size
+        return self.merge(valid)
+
+    def merge(self, samples):
+        """ Merges a flat chunk of valid samples into the statistics
+
+        :param np.ndarray samples: Flat array of finite samples
+        :rtype: StreamingStatistics
+        """
+        n = samples.size
+        if n == 0:
+            return self
+
+        # Pairwise update of the mean and the sum of squared deviations
+        mean = samples.mean()
+        m2 = np.sum((samples - mean) ** 2)
+        if self.count == 0:
+            self.mean, self.m2 = mean, m2
+        else:
+            total = self.count + n
+            delta = mean - self.mean
+            self.mean = self.mean + delta * (n / total)
+            self.m2 = self.m2 + m2 + delta ** 2 * (self.count * n / total)
+        self.count += n
+        self.min, self.max = min(self.min, samples.min()), max(self.max, samples.max())
+
+        self.fit(self.min, self.max)
+        index = np.floor((samples - self.lower) / self.width).astype(np.int64)
+        self.counts += np.bincount(np.clip(index, 0, self.counts.size - 1), minlength=self.counts.size)
+        return self
+
+    def fit(self, lower, upper):
+        """ Widens the histogram range, by merging pairs of bins, until the interval [`lower`, `upper`] is covered """
+        bins = self.counts.size
+        if self.lower is None:
+            span = upper - lower
+            self.width = span / bins if span > 0 else max(abs(lower), 1.) * 1e-12
+            self.lower = lower
+            return
+
+        while lower < self.lower or upper > self.upper:
+            merged = self.counts.reshape(-1, 2).sum(axis=1)
+            self.counts = np.zeros_like(self.counts)
+            if lower < self.lower:  # Extending downwards, the current bins end up in the upper half
+                self.counts[bins // 2:] = merged
+                self.lower = self.upper - 2 * self.width * bins
+            else:  # Extending upwards, the current bins end up in the lower half
+                self.counts[:bins // 2] = merged
+            self.width *= 2
+
+    def quantile(self, q):
+        """ Quantile(s) of the samples, linearly interpolated within the histogram bins
+
+        :param q: Probability or array of probabilities in the interval [0, 1]
+        :rtype: float or np.ndarray
+        """
+        q = np.asarray(q, dtype=float)
+        if self.count == 0:
+            return np.full(q.shape, np.nan)
+        cdf = np.concatenate(([0.], np.cumsum(self.counts) / self.count))
+        edges = self.lower + self.width * np.arange(self.counts.size + 1)
+        return np.clip(np.interp(q, cdf, edges), self.min, self.max)
+
+    def summary(self, quantiles=(0.05, 0.5, 0.95)):
+        """ Dictionary of all statistics
+
+        :param collections.Sequence[float] quantiles: Probabilities of the quantiles to report
+        :rtype: dict
+        """
+        return {'count': self.count,
+                'invalid': self.invalid,
+                'mean': self.mean,
+                'variance': self.variance,
+                'std': self.std,
+                'min': self.min,
+                'max': self.max,
+                'quantiles': dict(zip(quantiles, self.quantile(quantiles)))}
+
+
+if __name__ == '__main__':
+    stats = StreamingStatistics()
+    rng = np.random.RandomState(0)
+    for _ in range(10):
+        stats.update(rng.normal(10., 2., 100000))
+    print(stats)
+    print(stats.quantile([0.025, 0.5, 0.975]))
@@ -0,0 +1,215 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" Contains a binary store for the (nested) array results of batched runs that can be read back memory-mapped """
+
+from attrdict import AttrDict
+import numpy as np
+import hashlib
+import json
+import os
+
+__author__ = 'San Kilkis'
+
+
+class ResultsStore(object):
+
+    # Name of the file that holds the metadata of a store
+    __metadata__ = 'metadata.json'
+
+    # Suffix of the file that holds the mask of a masked array
+    __mask__ = '.mask'
+
+    def __init__(self, directory):
+        """ Directory of NumPy ``.npy`` files, one per array of a (nested) dictionary of results, w/ the nesting
+        reflected by sub-directories (i.e. `stations/8/p_total.npy`) and a JSON file of metadata. Contrary to a
+        compressed ``.npz`` archive each array can be memory-mapped, hence reading a slice of a large sweep only reads
+        the pages of that slice from disk w/o loading or parsing the remainder of the store:
+
+        >>> store = ResultsStore('GENX_results')
+        >>> store['stations/8/p_total'][1000:2000]
+
+        Masked arrays are stored as their data and a boolean mask next to it. Arrays can also be allocated first and
+        filled in chunks w/ :py:meth:`allocate`, such that a store can be larger than the available memory.
+
+        :param str directory: Path of the store
+        """
+        self.directory = os.path.abspath(directory)
+        self._writable = {}  # Memory-maps of the arrays that are being filled by :py:meth:`write_chunk`
+
+    def __repr__(self):
+        return "<'{}' {} w/ {} array(s) at {}>".format(os.path.basename(self.directory), self.__class__.__name__,
+                                                      len(self.keys()), hex(id(self)))
+
+    def __contains__(self, key):
+        return os.path.isfile(self.path(key))
+
+    def path(self, key):
+        """ Path of the ``.npy`` file of the array `key`, where nested keys are separated by a forward slash """
+        return os.path.join(self.directory, *(key.split('/'))) + '.npy'
+
+    def keys(self):
+        """ Keys of all arrays in the store w/o the masks
+
+        :rtype: list[str]
+        """
+        keys = []
+        for root, _, files in os.walk(self.directory):
+            relative = os.path.relpath(root, self.directory)
+            prefix = '' if relative == os.curdir else relative.replace(os.sep, '/') + '/'
+            keys += [prefix + name[:-len('.npy')] for name in files
+                     if name.endswith('.npy') and not name.endswith(self.__mask__ + '.npy')]
+        return sorted(keys)
+
+    @property
+    def metadata(self):
+        """ Metadata of the store, i.e. the engine name, hash of the specification and ideal/real flag
+
+        :rtype: AttrDict
+        """
+        path = os.path.join(self.directory, self.__metadata__)
+        if not os.path.isfile(path):
+            return AttrDict({})
+        with open(path) as metadata:
+            return AttrDict(json.load(metadata))
+
+    @staticmethod
+    def digest(mapping):
+        """ SHA-1 hash of a mapping of scalars, strings and arrays that is independent of the order of the keys
+
+        :param dict mapping: Mapping to hash, i.e. the specification of an engine
+        :rtype: str
+        """
+        sha = hashlib.sha1()
+        for key in sorted(mapping.keys()):
+            value = mapping[key]
+            sha.update(repr(key).encode('utf-8'))
+            if isinstance(value, dict):
+                sha.update(ResultsStore.digest(value).encode('utf-8'))
+            elif value is None or isinstance(value, (bool, str, type(u''))):
+                sha.update(repr(value).encode('utf-8'))
+            else:
+                value = np.ascontiguousarray(np.ma.filled(getattr(value, 'value', value), np.nan))
+                sha.update(repr((value.dtype.str, value.shape)).encode('utf-8'))
+                sha.update(value.tobytes())
+        return sha.hexdigest()
+
+    def write_metadata(self, **metadata):
+        """ Updates the metadata of the store w/ the JSON-serializable keyword arguments """
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+        merged = dict(self.metadata, **metadata)
+        with open(os.path.join(self.directory, self.__metadata__), 'w') as handle:
+            json.dump(merged, handle, indent=4, sort_keys=True)
+
+    def allocate(self, key, shape, dtype=float):
+        """ Creates the array `key` on disk w/o initializing it in memory
+
+        :return: Writable memory-mapped array
+        :rtype: np.memmap
+        """
+        path = self.path(key)
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        return np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=tuple(shape))
+
+    def write(self, results, prefix=''):
+        """ Writes all arrays of the (nested) dictionary `results`, values that are not arrays are skipped
+
+        :param dict results: Results, i.e. the outputs of :py:meth:`CycleKernel.evaluate`
+        :param str prefix: (Optional) Key under which the results are stored, i.e. 'inputs'
+        """
+        for key, value in results.items():
+            key = '{}/{}'.format(prefix, key) if prefix else str(key)
+            if isinstance(value, dict):
+                self.write(value, key)
+                continue
+            value = getattr(value, 'value', value)  # Dual numbers are stored w/o their derivatives
+            if not isinstance(value, (np.ndarray, float, int, bool, np.number, np.bool_)):
+                continue
+            if isinstance(value, np.ma.MaskedArray):
+                self.allocate(key + self.__mask__, value.shape, dtype=bool)[...] = np.ma.getmaskarray(value)
+                value = value.data
+            else:
+                self.remove(key + self.__mask__)  # A mask of previous results would be applied to the new data
+            self.allocate(key, np.shape(value), dtype=np.asarray(value).dtype)[...] = value
+
+    def write_chunk(self, results, chunk, shape, prefix=''):
+        """ Writes the flat `chunk` of the (nested) dictionary `results` into arrays of the full `shape`, which are
+        allocated w/ :py:meth:`allocate` by the first chunk, thus a store can be filled by a streamed sweep w/o ever
+        holding more than one chunk in memory
+
+        :param dict results: Results of the chunk, each quantity is a flat array w/ the length of the chunk
+        :param slice chunk: Position of the chunk within the flattened arrays
+        :param tuple shape: Shape of the complete arrays
+        :param str prefix: (Optional) Key under which the results are stored
+        """
+        for key, value in results.items():
+            key = '{}/{}'.format(prefix, key) if prefix else str(key)
+            if isinstance(value, dict):
+                self.write_chunk(value, chunk, shape, key)
+                continue
+            value = getattr(value, 'value', value)
+            if isinstance(value, np.ma.MaskedArray):
+                self.write_chunk({key + self.__mask__: np.ma.getmaskarray(value)}, chunk, shape)
+                value = value.data
+            elif chunk.start == 0:
+                self.remove(key + self.__mask__)  # The mask is allocated, thus unmasked, by the first masked chunk
+            value = np.asarray(value)
+            if chunk.start == 0 or (key not in self._writable and key not in self):
+                self._writable[key] = self.allocate(key, shape, dtype=value.dtype)
+            elif key not in self._writable:
+                self._writable[key] = np.load(self.path(key), mmap_mode='r+')
+            self._writable[key].reshape(-1)[chunk] = value
+
+    def remove(self, key):
+        """ Removes the array `key` from the store if it is present """
+        self._writable.pop(key, None)
+        if key in self:
+            os.remove(self.path(key))
+
+    def clear(self):
+        """ Removes all arrays and masks from the store, the metadata is kept """
+        self._writable = {}
+        if not os.path.isdir(self.directory):
+            return
+        for root, directories, files in os.walk(self.directory, topdown=False):
+            for name in files:
+                if name.endswith('.npy'):
+                    os.remove(os.path.join(root, name))
+            if root != self.directory and not os.listdir(root):
+                os.rmdir(root)
+
+    def flush(self):
+        """ Writes the arrays that were filled by :py:meth:`write_chunk` to disk and releases their memory-maps """
+        for array in self._writable.values():
+            array.flush()
+        self._writable = {}
+
+    def __getitem__(self, key):
+        """ Memory-mapped array `key`, which is masked if a mask is present in the store
+
+        :rtype: np.ndarray
+        """
+        if key not in self:
+            raise KeyError("Array '{}' is not present in results store {}".format(key, self.directory))
+        data = np.load(self.path(key), mmap_mode='r')
+        if key + self.__mask__ in self:
+            return np.ma.MaskedArray(data, mask=np.load(self.path(key + self.__mask__), mmap_mode='r'))
+        return data
+
+    def load(self, prefix=''):
+        """ Nested dictionary of the memory-mapped arrays under `prefix`, i.e. 'stations' or all arrays by default
+
+        :rtype: AttrDict
+        """
+        nested = {}
+        for key in self.keys():
+            if prefix and not key.startswith(prefix.rstrip('/') + '/'):
+                continue
+            parts = key[len(prefix.rstrip('/') + '/'):].split('/') if prefix else key.split('/')
+            entry = nested
+            for part in parts[:-1]:
+                entry = entry.setdefault(part, {})
+            entry[parts[-1]] = self[key]
+        return AttrDict(nested)
@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" Contains a background writer that overlaps the serialization of results to disk w/ computation """
+
+import threading
+import atexit
+
+try:
+    import Queue as queue
+except ImportError:
+    import queue
+
+__author__ = 'San Kilkis'
+
+
+class AsyncWriter(object):
+
+    # Writer that can be shared by the write_csv methods of the current process, see :py:meth:`shared`
+    __shared__ = None
+
+    def __init__(self, max_queue=4):
+        """ Serializes results to disk on a background thread. Finished batches are submitted as a function and its
+        arguments, i.e. a bulk-formatted text or a chunk of a :py:class:`ResultsStore`, to a bounded queue and the
+        calling thread continues w/ the next batch. If the queue is full :py:meth:`submit` blocks until the writer has
+        caught up, hence at most `max_queue` batches are held in memory. Tasks are executed in order of submission.
+
+        Errors raised on the writer thread are re-raised by the next call of :py:meth:`submit`, :py:meth:`flush` or
+        :py:meth:`close`, any tasks that are still queued at that point are discarded. Since errors surface late, the
+        write_csv methods only write in the background if a writer is provided explicitly:
+
+        >>> with AsyncWriter() as writer:
+        ...     engine.write_csv(writer=writer)
+
+        :param int max_queue: Maximum number of pending batches
+        """
+        if int(max_queue) < 1:
+            raise ValueError('The maximum size of the queue must be a positive integer')
+        self.queue = queue.Queue(maxsize=int(max_queue))
+        self.error = None
+        self.closed = False
+        self.thread = threading.Thread(target=self.run, name=self.__class__.__name__)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def __repr__(self):
+        return '<{} w/ {} pending batch(es) at {}>'.format(self.__class__.__name__, self.queue.qsize(), hex(id(self)))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @classmethod
+    def shared(cls):
+        """ Process-wide writer that is closed, thus flushed, when the interpreter exits
+
+        :rtype: AsyncWriter
+        """
+        if cls.__shared__ is None or cls.__shared__.closed:
+            cls.__shared__ = cls()
+            atexit.register(cls.__shared__.close)
+        return cls.__shared__
+
+    def run(self):
+        """ Executes the queued tasks until the sentinel ``None`` is received """
+        while True:
+            task = self.queue.get()
+            try:
+                if task is None:
+                    return
+                if self.error is None:
+                    func, args, kwargs = task
+                    func(*args, **kwargs)
+            except BaseException as e:
+                self.error = e
+            finally:
+                self.queue.task_done()
+
+    def check(self):
+        """ Re-raises an error that occurred on the writer thread after discarding all pending tasks """
+        if self.error is not None:
+            self.discard()
+            error, self.error = self.error, None
+            raise error
+
+    def discard(self):
+        """ Removes all pending tasks from the queue w/o executing them, the sentinel of :py:meth:`close` is kept """
+        while True:
+            try:
+                task = self.queue.get_nowait()
+            except queue.Empty:
+                return
+            self.queue.task_done()
+            if task is None:
+                self.queue.put_nowait(None)
+                return
+
+    def submit(self, func, *args, **kwargs):
+        """ Queues the call of `func` w/ the provided arguments, blocks while the queue is full """
+        self.check()
+        if self.closed:
+            raise RuntimeError('Cannot submit to a closed {}'.format(self.__class__.__name__))
+        self.queue.put((func, args, kwargs))
+
+    def write(self, filename, text, mode='w'):
+        """ Queues writing `text` to `filename`
+
+        :param str filename: Path of the file
+        :param str text: Contents of the file, formatted in bulk
+        :param str mode: Mode in which the file is opened, i.e. 'a' to append
+        """
+        self.submit(self.dump, filename, text, mode)
+
+    @staticmethod
+    def dump(filename, text, mode='w'):
+        with open(filename, mode) as handle:
+            handle.write(text)
+
+    def flush(self):
+        """ Blocks until all queued tasks are completed """
+        self.queue.join()
+        self.check()
+
+    def close(self):
+        """ Completes all queued tasks and stops the writer thread """
+        if not self.closed:
+            self.closed = True
+            self.queue.put(None)
+            self.thread.join()
+        self.check()
+
+
+class SyncWriter(object):
+
+    def __init__(self):
+        """ Executes the tasks of an :py:class:`AsyncWriter` immediately on the calling thread, hence the file exists
+        and any I/O error is raised when :py:meth:`submit` returns. This is the default writer of the write_csv
+        methods. """
+        self.closed = False
+
+    def __repr__(self):
+        return '<{} at {}>'.format(self.__class__.__name__, hex(id(self)))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @staticmethod
+    def submit(func, *args, **kwargs):
+        """ Calls `func` w/ the provided arguments """
+        func(*args, **kwargs)
+
+    def write(self, filename, text, mode='w'):
+        """ Writes `text` to `filename`, see :py:meth:`AsyncWriter.write` """
+        AsyncWriter.dump(filename, text, mode)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True